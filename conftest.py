@@ -0,0 +1,3 @@
+# pytest adds the directory holding the root conftest.py to sys.path (the pinned
+# pytest 6.2 has no pythonpath ini option), so tests can import the bot's packages
+# without appending to sys.path themselves.
@@ -34,7 +34,7 @@ from models.helper.TextBoxHelper import TextBox
 from models.helper.LogHelper import Logger
 from models.Strategy import Strategy
 from views.TradingGraphs import TradingGraphs
-from views.PyCryptoBot import RichText
+from views.PyCryptoBot import BufferedConsole, RichText
 from utils.PyCryptoBot import truncate as _truncate
 from utils.PyCryptoBot import compare as _compare
 
@@ -71,13 +71,13 @@ def signal_handler(signum):
 
 
 class PyCryptoBot(BotConfig):
-    def __init__(self, config_file: str = None, exchange: Exchange = None):
+    def __init__(self, config_file: str = None, exchange: Exchange = None, config_dict: dict = None):
         self.config_file = config_file or "config.json"
         self.exchange = exchange
-        super(PyCryptoBot, self).__init__(filename=self.config_file, exchange=self.exchange)
+        super(PyCryptoBot, self).__init__(config_file=self.config_file, exchange=self.exchange, config_dict=config_dict)
 
         self.console_term = Console()  # logs to the screen
-        self.console_log = Console(file=open(self.logfile, "w"))  # logs to file
+        self.console_log = BufferedConsole(file=open(self.logfile, "w"))  # logs to file, flushed each tick
 
         self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)
 
@@ -1495,6 +1495,8 @@ class PyCryptoBot(BotConfig):
             if self.is_sim and self.smart_switch:
                 self.state.iterations = self.state.iterations - 1
 
+        self.flush_consoles()
+
         # if live but not websockets
         if not self.disabletracker and self.is_live and not self.websocket_connection:
             # update order tracker csv
@@ -1630,6 +1632,7 @@ class PyCryptoBot(BotConfig):
                 Logger.warning("Please wait while threads complete gracefully....")
             else:
                 Logger.warning(f"{str(datetime.now())} bot is closed via keyboard interrupt...")
+            self.flush_consoles()
             try:
                 try:
                     self.telegram_bot.remove_active_bot()
@@ -1653,10 +1656,15 @@ class PyCryptoBot(BotConfig):
                 except Exception:
                     pass
             Logger.critical(repr(e))
+            self.flush_consoles()
             # pylint: disable=protected-access
             os._exit(0)
             # raise
 
+    def flush_consoles(self) -> None:
+        """Write notifications still buffered for the log file"""
+        RichText.flush(self)
+
     def notify_telegram(self, msg: str) -> None:
         """
         Send a given message to preconfigured Telegram. If the telegram isn't enabled, e.g. via `--disabletelegram`,
@@ -2205,6 +2213,12 @@ class PyCryptoBot(BotConfig):
         config_option_row_str("Trades File", "tradesfile", "Use the simulation log trades at the given location", break_below=True, default_value="trades.csv", arg_name="tradesfile")
 
         config_option_row_bool("Enable Log", "disablelog", "Enable console logging", store_invert=True, default_value=True, arg_name="log")
+        config_option_row_bool(
+            "Fast Log", "fast_log", "Plain ANSI notifications without rich formatting", store_invert=False, default_value=False, arg_name="fastlog"
+        )
+        config_option_row_str(
+            "Min Log Level", "min_log_level", "Lowest notification level shown", break_below=False, default_value="normal", arg_name="minloglevel"
+        )
         config_option_row_bool(
             "Enable Tracker", "disabletracker", "Enable trade order logging", store_invert=True, default_value=False, arg_name="tradetracker"
         )
@@ -1,4 +1,6 @@
 import argparse
+import copy
+import functools
 import json
 import os
 import re
@@ -22,6 +24,36 @@ from models.exchange.ExchangesEnum import Exchange
 from models.helper.LogHelper import Logger
 
 
+README_VERSION_RE = re.compile(r"^# Python Crypto Bot (v\d{1,3}\.\d{1,3}\.\d{1,3})")
+
+
+@functools.lru_cache(maxsize=1)
+def _read_version_from_readme() -> str:
+    """README.md does not change while running, so it is only parsed once"""
+    version = "v0.0.0"
+    try:
+        with open("README.md", "r", encoding="utf8") as stream:
+            for line in stream:
+                match = README_VERSION_RE.search(line)
+                try:
+                    if match is None:
+                        Logger.error("Could not find version in README.md")
+                        sys.exit()
+
+                    version = match.group(1)
+                    break
+                except Exception:
+                    continue
+
+        if version == "v0.0.0":
+            Logger.error("Could not find version in README.md")
+            sys.exit()
+
+        return version
+    except Exception:
+        raise
+
+
 class BotConfig:
     def __init__(self, *args, **kwargs):
         self.cli_args = self._parse_arguments()
@@ -107,6 +139,8 @@ class BotConfig:
         self.enable_custom_strategy = False
         self.disabletelegram = False
         self.disablelog = False
+        self.fast_log = False
+        self.min_log_level = "normal"
         self.disabletracker = True
         self.enableml = False
         self.websocket = False
@@ -151,6 +185,8 @@ class BotConfig:
 
         self.config_provided = False
         self.config = {}
+        # an already parsed config, used instead of reading config_file
+        self.config_dict = kwargs.get("config_dict", None)
 
         if self.cli_args["config"] is not None:
             self.config_file = self.cli_args["config"]
@@ -182,9 +218,14 @@ class BotConfig:
             consoleloglevel=self.consoleloglevel,
         )
 
-    # read and set config from file
+    # read and set config from config_dict or file
     def read_config(self, exchange):
-        if os.path.isfile(self.config_file):
+        if self.config_dict is not None:
+            self.config_provided = True
+            # the parsers fill in and rewrite sections, keep that off the caller's dict
+            self.config = copy.deepcopy(self.config_dict)
+
+        elif os.path.isfile(self.config_file):
             self.config_provided = True
             try:
                 with open(self.config_file, "r", encoding="utf8") as stream:
@@ -327,29 +368,7 @@ class BotConfig:
         )
 
     def get_version_from_readme(self) -> str:
-        regex = r"^# Python Crypto Bot (v\d{1,3}\.\d{1,3}\.\d{1,3})"
-        version = "v0.0.0"
-        try:
-            with open("README.md", "r", encoding="utf8") as stream:
-                for line in stream:
-                    match = re.search(regex, line)
-                    try:
-                        if match is None:
-                            Logger.error("Could not find version in README.md")
-                            sys.exit()
-
-                        version = match.group(1)
-                        break
-                    except Exception:
-                        continue
-
-            if version == "v0.0.0":
-                Logger.error("Could not find version in README.md")
-                sys.exit()
-
-            return version
-        except Exception:
-            raise
+        return _read_version_from_readme()
 
     def _set_recv_window(self):
         recv_window = 5000
@@ -395,6 +414,8 @@ class BotConfig:
         parser.add_argument("--statdetail", action="store_true", help="display detail of completed transactions for a given market")
 
         parser.add_argument("--log", type=int, help="Enable console logging")
+        parser.add_argument("--fastlog", type=int, help="Plain ANSI notifications without rich formatting")
+        parser.add_argument("--minloglevel", type=str, help="Lowest notification level shown: 'normal', 'warning', 'error', 'critical'")
         parser.add_argument("--smartswitch", type=int, help="Smart switch between 1 hour and 15 minute intervals")
         parser.add_argument("--tradetracker", type=int, help="Enable trade order logging")
         parser.add_argument("--autorestart", type=int, help="Auto restart the bot in case of exception")
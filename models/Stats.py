@@ -15,7 +15,7 @@ class Stats:
 
     def get_data(self, market):
         # get completed live orders
-        self.app.setLive(1)
+        self.app.is_live = 1
         self.orders = self.account.get_orders(market, "", "done")
         self.app.setMarket(market)
         if self.fiat_currency is not None:
@@ -68,7 +68,8 @@ def parser(app, binance_config, args={}):
         raise Exception("No app is passed")
 
     if isinstance(binance_config, dict):
-        if "api_key" in binance_config or "api_secret" in binance_config:
+        # keys passed in with an in-memory config_dict are used as they are, there is no config.json to migrate
+        if getattr(app, "config_dict", None) is None and ("api_key" in binance_config or "api_secret" in binance_config):
             print(">>> migrating api keys to binance.key <<<\n")
 
             # create 'binance.key'
@@ -25,7 +25,8 @@ def parser(app, coinbase_config, args={}):
         raise Exception("No app is passed")
 
     if isinstance(coinbase_config, dict):
-        if "api_key" in coinbase_config or "api_secret" in coinbase_config or "api_passphrase" in coinbase_config:
+        # keys passed in with an in-memory config_dict are used as they are, there is no config.json to migrate
+        if getattr(app, "config_dict", None) is None and ("api_key" in coinbase_config or "api_secret" in coinbase_config or "api_passphrase" in coinbase_config):
             print(">>> migrating api keys to coinbasepro.key <<<\n")
 
             # create 'coinbasepro.key'
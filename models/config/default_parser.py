@@ -189,6 +189,8 @@ def default_config_parse(app, config):
     config_option_bool(option_name="statdetail", option_default=False, store_name="statdetail", store_invert=False)
 
     config_option_bool(option_name="log", option_default=True, store_name="disablelog", store_invert=True)
+    config_option_bool(option_name="fastlog", option_default=False, store_name="fast_log", store_invert=False)
+    config_option_str(option_name="minloglevel", option_default="normal", store_name="min_log_level", valid_options=["normal", "warning", "error", "critical"])
     config_option_bool(option_name="smartswitch", option_default=False, store_name="smart_switch", store_invert=False)
     config_option_bool(option_name="tradetracker", option_default=False, store_name="disabletracker", store_invert=True)
     config_option_bool(option_name="autorestart", option_default=False, store_name="autorestart", store_invert=False)
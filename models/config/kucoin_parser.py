@@ -26,7 +26,8 @@ def parser(app, kucoin_config, args={}):
         raise Exception('No app is passed')
 
     if isinstance(kucoin_config, dict):
-        if 'api_key' in kucoin_config or 'api_secret' in kucoin_config or 'api_passphrase' in kucoin_config:
+        # keys passed in with an in-memory config_dict are used as they are, there is no config.json to migrate
+        if getattr(app, 'config_dict', None) is None and ('api_key' in kucoin_config or 'api_secret' in kucoin_config or 'api_passphrase' in kucoin_config):
             print('>>> migrating api keys to kucoin.key <<<', "\n")
 
             # create 'kucoin.key'
@@ -1,6 +1,7 @@
 from json.decoder import JSONDecodeError
 import os
 import json
+import threading
 from time import sleep
 from datetime import datetime
 
@@ -116,17 +117,22 @@ class TelegramBotHelper:
 
     def _write_data(self, name: str = "") -> bool:
         file = self.filename if name == "" else name
+        path = os.path.join(self.app.telegramdatafolder, "telegram_data", file)
+        # write to a temp file and rename it over the original so the telegram
+        # bot never reads a partially written file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
         try:
-            with open(
-                os.path.join(self.app.telegramdatafolder, "telegram_data", file),
-                "w",
-                encoding="utf8",
-            ) as outfile:
+            with open(tmp_path, "w", encoding="utf8") as outfile:
                 json.dump(self.data, outfile, indent=4)
+            os.replace(tmp_path, path)
             return True
         except JSONDecodeError as err:
             Logger.critical(str(err))
             return False
+        finally:
+            # only left behind if the write or rename failed
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     def add_margin(
         self,
@@ -262,16 +268,11 @@ class TelegramBotHelper:
             self.delete_margin()
 
     def save_scanner_output(self, exchange, quote, output: DataFrame) -> None:
-        try:
-            os.remove(
-                os.path.join(  # TODO: path -> ntpath for Windows, posixpath for Linux, macpath for Mac OSX
-                    self.app.telegramdatafolder,
-                    "telegram_data",
-                    f"{exchange}_{quote}_output.json",
-                )
-            )
-        except FileNotFoundError:
-            pass
+        path = os.path.join(  # TODO: path -> ntpath for Windows, posixpath for Linux, macpath for Mac OSX
+            self.app.telegramdatafolder,
+            "telegram_data",
+            f"{exchange}_{quote}_output.json",
+        )
 
         sort_columns = []
         ascend = []
@@ -287,14 +288,13 @@ class TelegramBotHelper:
 
         output = output.sort_values(by=sort_columns, ascending=ascend, inplace=False)
 
-        output.to_json(
-            os.path.join(
-                self.app.telegramdatafolder,
-                "telegram_data",
-                f"{exchange}_{quote}_output.json",
-            ),
-            orient="index",
-        )
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            output.to_json(tmp_path, orient="index")
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     def add_open_order(self):
         if not self.app.is_sim and self.app.telegrambotcontrol:
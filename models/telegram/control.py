@@ -117,7 +117,7 @@ class TelegramControl:
             self.helper.send_telegram_message(update, f"<i>{mode} bots</i>", context=context, new_message=False)
 
             for pair in self.helper.get_active_bot_list(status):
-                self.helper.stop_running_bot(pair, state, False if query.data.__contains__("allclose") else True)
+                self.helper.stop_running_bot(pair, state, "allclose" not in query.data)
                 sleep(1)
         else:
             self.helper.send_telegram_message(update, f"<i>{mode} bots</i>", context=context, new_message=False)
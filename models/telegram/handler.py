@@ -2,6 +2,7 @@
 
 import json
 from datetime import datetime
+from apscheduler.executors.pool import ThreadPoolExecutor as APSExecutor
 from apscheduler.schedulers.background import BackgroundScheduler
 from telegram import InlineKeyboardMarkup, InlineKeyboardButton, Update
 from telegram.ext import CallbackContext
@@ -21,7 +22,13 @@ class TelegramHandler:
     """Handles response calls from TG"""
 
     def __init__(self, authuserid, tg_helper: TelegramHelper) -> None:
-        self.scannerSchedule = BackgroundScheduler(timezone="UTC")
+        # run scans on their own pool and collapse missed runs into one,
+        # so a long scan can't queue up behind itself
+        self.scannerSchedule = BackgroundScheduler(
+            timezone="UTC",
+            executors={"default": APSExecutor(4)},
+            job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 30},
+        )
 
         self.authoriseduserid = authuserid
         self.helper = tg_helper
@@ -278,8 +285,8 @@ class TelegramHandler:
                 update,
                 context,
                 self.helper.use_default_scanner,
-                True if query.data != "noscan" else False,
-                True if query.data != "scanonly" else False,
+                query.data != "noscan",
+                query.data != "scanonly",
             )
         elif query.data == "stopmarket":
             self._remove_scheduled_job(update, context)
@@ -581,7 +588,6 @@ class TelegramHandler:
                 trigger="interval",
                 minutes=self.helper.config["scanner"]["autoscandelay"] * 60,
                 name=f"Volume Auto Scanner ({datetime.now().isoformat()})",
-                misfire_grace_time=10,
             )
 
             reply = "<b>Scan job schedule created to run every " f"{self.helper.config['scanner']['autoscandelay']} hour(s)</b> \u2705"
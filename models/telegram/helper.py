@@ -1,25 +1,104 @@
 """ Telegram Bot Helper """
 import os
+import mmap
 import platform
 import subprocess
 import json
 import logging
+import threading
 
-# from time import sleep
 from json.decoder import JSONDecodeError
 
-# from time import sleep
+from time import sleep
+from collections import OrderedDict
 from datetime import datetime
 from typing import List
 from telegram import InlineKeyboardMarkup, Update
 import telegram
+from telegram.error import RetryAfter
 from telegram.ext import Updater
 from telegram.ext.callbackcontext import CallbackContext
+from models.telegram.ratelimiter import throttle
+
+try:
+    import orjson
+
+    use_orjson = True
+except ImportError:
+    use_orjson = False
 
 if not os.path.exists(os.path.join(os.curdir, "telegram_logs")):
     os.mkdir(os.path.join(os.curdir, "telegram_logs"))
 
 
+JSON_READ_BUFFER = 65536
+
+
+def load_json_file(path: str):
+    """Load a json file, parsing it from a read only mmap when orjson is available"""
+    # bot files are typically well under 64KB, so the fallback is a single read
+    with open(path, "rb", buffering=JSON_READ_BUFFER) as json_file:
+        if use_orjson and os.fstat(json_file.fileno()).st_size > 0:
+            with mmap.mmap(json_file.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+        return json.loads(json_file.read())
+
+
+def dumps_json(data) -> str:
+    """Serialise to compact json, using orjson when available"""
+    if use_orjson:
+        return orjson.dumps(data).decode("utf8")
+    return json.dumps(data)
+
+
+def write_json_file(path: str, data) -> None:
+    """Write a json file via a temp file and rename, so readers never see it half written"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        # same layout as the bot side writes, whichever process last wrote the file
+        with open(tmp_path, "w", encoding="utf8") as outfile:
+            json.dump(data, outfile, indent=4)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+JSON_CACHE_SIZE = 256
+_json_cache = OrderedDict()
+_json_cache_lock = threading.Lock()
+
+
+def cached_json(path: str):
+    """Load a json file, reusing the last parsed result while the file is unchanged
+
+    The returned object is shared with other readers and must not be modified.
+    """
+    stat = os.stat(path)
+    # writers replace the file, so a new inode catches rewrites within the mtime granularity
+    key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    with _json_cache_lock:
+        entry = _json_cache.get(path)
+        if entry is not None and entry[0] == key:
+            _json_cache.move_to_end(path)
+            return entry[1]
+
+    data = load_json_file(path)
+    with _json_cache_lock:
+        _json_cache[path] = (key, data)
+        _json_cache.move_to_end(path)
+        if len(_json_cache) > JSON_CACHE_SIZE:
+            _json_cache.popitem(last=False)
+    return data
+
+
+def uncache_json(path: str) -> None:
+    """Drop a cached json file, used when it is rewritten"""
+    with _json_cache_lock:
+        _json_cache.pop(path, None)
+
+
 class TelegramHelper:
     """Telegram Bot Helper"""
 
@@ -43,8 +122,7 @@ class TelegramHelper:
         # self.logger = None
         self.logger = logging.getLogger("telegram.helper")
 
-        with open(os.path.join(configfile), "r", encoding="utf8") as json_file:
-            self.config = json.load(json_file)
+        self.config = load_json_file(configfile)
 
         self.load_config()
         self.read_screener_config(test_run)
@@ -169,59 +247,72 @@ class TelegramHelper:
                 chat_instance="",
             )
 
-        if new_message or update is None:
-            context.bot.send_message(
-                chat_id=self.config["telegram"]["user_id"],
-                text=reply,
-                reply_markup=markup,
-                parse_mode="HTML",
-            )
-        else:
-            context.bot.edit_message_text(
-                chat_id=update.effective_message.chat_id,
-                message_id=update.effective_message.message_id,
-                text=reply,
-                reply_markup=markup,
-                parse_mode="HTML",
-            )
+        # the rate limiter keeps us under Telegram's flood limits, if we still
+        # hit them wait exactly as long as Telegram asks before trying again
+        try_count = 0
+        while True:
+            try_count += 1
+            try:
+                if new_message or update is None:
+                    throttle(self.config["telegram"]["user_id"])
+                    context.bot.send_message(
+                        chat_id=self.config["telegram"]["user_id"],
+                        text=reply,
+                        reply_markup=markup,
+                        parse_mode="HTML",
+                    )
+                else:
+                    throttle(update.effective_message.chat_id)
+                    context.bot.edit_message_text(
+                        chat_id=update.effective_message.chat_id,
+                        message_id=update.effective_message.message_id,
+                        text=reply,
+                        reply_markup=markup,
+                        parse_mode="HTML",
+                    )
+                return
+            except RetryAfter as err:
+                if try_count > 3:
+                    raise
+                self.logger.warning("Flood control exceeded, retrying in %s seconds", err.retry_after)
+                sleep(err.retry_after)
 
     def read_data(self, name: str = "data.json") -> bool:
         """Read data from json file"""
         fname = name if name.__contains__(".json") else f"{name}.json"
         # self.logger.debug("METHOD(read_data) - DATA(%s)", fname)
-        read_ok, try_count = False, 0
-        while not read_ok and try_count <= 20:
-            try_count += 1
-            try:
-                self.data = {}
-                with open(
-                    os.path.join(self.datafolder, "telegram_data", fname),
-                    "r",
-                    encoding="utf8",
-                ) as json_file:
-                    self.data = json.load(json_file)
-                read_ok = True
-            except FileNotFoundError:
-                if try_count == 20:
-                    self.logger.error("File Not Found {%s}", fname)
-            except JSONDecodeError:
-                if try_count == 20:
-                    self.logger.error("Unable to read file {%s}", fname)
+        # writers replace the file atomically, so a single read is enough. self.data
+        # is modified in place by callers, so it gets its own copy rather than the cached one
+        read_ok = False
+        try:
+            self.data = load_json_file(os.path.join(self.datafolder, "telegram_data", fname))
+            read_ok = True
+        except FileNotFoundError:
+            self.data = {}
+            self.logger.error("File Not Found {%s}", fname)
+        except JSONDecodeError:
+            self.data = {}
+            self.logger.error("Unable to read file {%s}", fname)
 
         return read_ok
 
+    def get_bot_data(self, name: str) -> dict:
+        """Return read only data from json file without changing self.data, None if unreadable"""
+        fname = name if name.__contains__(".json") else f"{name}.json"
+        try:
+            return cached_json(os.path.join(self.datafolder, "telegram_data", fname))
+        except (FileNotFoundError, JSONDecodeError):
+            return None
+
     def write_data(self, name: str = "data.json") -> None:
         """Write data to json file"""
         fname = name if name.__contains__(".json") else f"{name}.json"
         self.logger.debug("METHOD(write_data) - DATA(%s)", fname)
+        path = os.path.join(self.datafolder, "telegram_data", fname)
         try:
-            with open(
-                os.path.join(self.datafolder, "telegram_data", fname),
-                "w",
-                encoding="utf8",
-            ) as outfile:
-                json.dump(self.data, outfile, indent=4)
-                return True
+            uncache_json(path)
+            write_json_file(path, self.data)
+            return True
         except JSONDecodeError as err:
             self.logger.error(err)
             return False
@@ -230,8 +321,7 @@ class TelegramHelper:
         """Read config file"""
         self.logger.debug("METHOD(read_config)")
         try:
-            with open(os.path.join(self.config_file), "r", encoding="utf8") as json_file:
-                self.config = json.load(json_file)
+            self.config = load_json_file(self.config_file)
         except FileNotFoundError:
             return
         except json.decoder.JSONDecodeError:
@@ -255,8 +345,7 @@ class TelegramHelper:
         """Read screener config file"""
         self.logger.debug("METHOD(read_screener_config)")
         try:
-            with open("screener.json" if not test_run else "screener.json.sample", "r", encoding="utf8") as json_file:
-                self.screener = json.load(json_file)
+            self.screener = load_json_file("screener.json" if not test_run else "screener.json.sample")
         except FileNotFoundError:
             return
         except json.decoder.JSONDecodeError:
@@ -282,12 +371,10 @@ class TelegramHelper:
 
         i = len(jsonfiles) - 1
         while i >= 0:
-            if jsonfiles[i] == "data.json" or jsonfiles[i].__contains__("output.json") or jsonfiles[i].__contains__(".csv") or jsonfiles[i] == "settings.json":
+            if jsonfiles[i] == "data.json" or jsonfiles[i].__contains__("output.json") or jsonfiles[i].__contains__(".csv") or jsonfiles[i] == "settings.json" or jsonfiles[i].endswith(".tmp"):
+                jsonfiles.pop(i)
+            elif self.get_bot_data(jsonfiles[i]) is None:
                 jsonfiles.pop(i)
-            else:
-                read_ok = self.read_data(jsonfiles[i])
-                if not read_ok:
-                    jsonfiles.pop(i)
             i -= 1
         jsonfiles.sort()
         return [x.replace(".json", "") if x.__contains__(".json") else x for x in jsonfiles]
@@ -299,13 +386,13 @@ class TelegramHelper:
 
         i = len(jsonfiles) - 1
         while i >= 0:
-            read_ok = self.read_data(jsonfiles[i])
-            if not read_ok:
+            data = self.get_bot_data(jsonfiles[i])
+            if data is None:
                 jsonfiles.pop(i)
                 i -= 1
                 continue
-            if "botcontrol" in self.data:
-                if not self.data["botcontrol"]["status"] == state:
+            if "botcontrol" in data:
+                if not data["botcontrol"]["status"] == state:
                     jsonfiles.pop(i)
             i -= 1
         jsonfiles.sort()
@@ -318,13 +405,13 @@ class TelegramHelper:
 
         i = len(jsonfiles) - 1
         while i >= 0:
-            read_ok = self.read_data(jsonfiles[i])
-            if not read_ok:
+            data = self.get_bot_data(jsonfiles[i])
+            if data is None:
                 jsonfiles.pop(i)
                 i -= 1
                 continue
-            if "botcontrol" in self.data:
-                if self.data["margin"] == " ":
+            if "botcontrol" in data:
+                if data["margin"] == " ":
                     jsonfiles.pop(i)
             i -= 1
         jsonfiles.sort()
@@ -337,23 +424,23 @@ class TelegramHelper:
 
         i = len(jsonfiles) - 1
         while i >= 0:
-            read_ok = self.read_data(jsonfiles[i])
-            if not read_ok:
+            data = self.get_bot_data(jsonfiles[i])
+            if data is None:
                 jsonfiles.pop(i)
                 i -= 1
                 continue
-            elif "botcontrol" in self.data:
-                if "watchdog_ping" in self.data["botcontrol"]:
-                    last_ping = datetime.strptime(self.data["botcontrol"]["watchdog_ping"], "%Y-%m-%dT%H:%M:%S.%f")
+            elif "botcontrol" in data:
+                if "watchdog_ping" in data["botcontrol"]:
+                    last_ping = datetime.strptime(data["botcontrol"]["watchdog_ping"], "%Y-%m-%dT%H:%M:%S.%f")
                     current_dt = datetime.now()
                     ping_delta = int((current_dt - last_ping).total_seconds())
-                    if self.data["botcontrol"]["status"] == state and ping_delta < 600:
+                    if data["botcontrol"]["status"] == state and ping_delta < 600:
                         jsonfiles.pop(i)
                 else:
-                    start_time = datetime.strptime(self.data["botcontrol"]["started"], "%Y-%m-%dT%H:%M:%S.%f")
+                    start_time = datetime.strptime(data["botcontrol"]["started"], "%Y-%m-%dT%H:%M:%S.%f")
                     current_dt = datetime.now()
                     start_delta = int((current_dt - start_time).total_seconds())
-                    if self.data["botcontrol"]["status"] == state and start_delta < 300:
+                    if data["botcontrol"]["status"] == state and start_delta < 300:
                         jsonfiles.pop(i)
             i -= 1
         jsonfiles.sort()
@@ -366,13 +453,13 @@ class TelegramHelper:
 
         i = len(jsonfiles) - 1
         while i >= 0:
-            read_ok = self.read_data(jsonfiles[i])
-            if not read_ok:
+            data = self.get_bot_data(jsonfiles[i])
+            if data is None:
                 jsonfiles.pop(i)
                 i -= 1
                 continue
-            if "botcontrol" in self.data:
-                if not self.data["botcontrol"]["startmethod"] == startMethod:
+            if "botcontrol" in data:
+                if not data["botcontrol"]["startmethod"] == startMethod:
                     jsonfiles.pop(i)
             i -= 1
         jsonfiles.sort()
@@ -385,13 +472,13 @@ class TelegramHelper:
 
         i = len(jsonfiles) - 1
         while i >= 0:
-            read_ok = self.read_data(jsonfiles[i])
-            if not read_ok:
+            data = self.get_bot_data(jsonfiles[i])
+            if data is None:
                 jsonfiles.pop(i)
                 i -= 1
                 continue
-            if "exchange" in self.data:
-                if not self.data["exchange"] == exchange:
+            if "exchange" in data:
+                if not data["exchange"] == exchange:
                     jsonfiles.pop(i)
             i -= 1
         # jsonfiles.sort()
@@ -486,29 +573,31 @@ class TelegramHelper:
                 return self.update_bot_control(pair, state)
 
     def create_callback_data(self, callback_tag, exchange: str = "", parameter: str = ""):
-        return json.dumps({"c": callback_tag, "e": exchange, "p": parameter})
+        return dumps_json({"c": callback_tag, "e": exchange, "p": parameter})
 
     def clean_data_folder(self):
         """check market files in data folder"""
         self.logger.debug("cleandata started")
+        data_dir = os.path.join(self.datafolder, "telegram_data")
         jsonfiles = self.get_active_bot_list()
         for i in range(len(jsonfiles), 0, -1):
             jfile = jsonfiles[i - 1]
+            jpath = os.path.join(data_dir, f"{jfile}.json")
 
             self.logger.info("checking %s", jfile)
 
-            self.read_data(jfile)
+            data = self.get_bot_data(jfile) or {}
 
-            last_modified = datetime.now() - datetime.fromtimestamp(os.path.getmtime(os.path.join(self.datafolder, "telegram_data", f"{jfile}.json")))
-            if "margin" not in self.data:
+            last_modified = datetime.now() - datetime.fromtimestamp(os.path.getmtime(jpath))
+            if "margin" not in data:
                 self.logger.info("deleting %s", jfile)
-                os.remove(os.path.join(self.datafolder, "telegram_data", f"{jfile}.json"))
+                os.remove(jpath)
                 continue
-            if self.data["botcontrol"]["status"] == "active" and last_modified.seconds > 120 and (last_modified.seconds != 86399 and last_modified.days != -1):
+            if data["botcontrol"]["status"] == "active" and last_modified.seconds > 120 and (last_modified.seconds != 86399 and last_modified.days != -1):
                 self.logger.info("deleting %s %s", jfile, str(last_modified))
-                os.remove(os.path.join(self.datafolder, "telegram_data", f"{jfile}.json"))
+                os.remove(jpath)
                 continue
-            elif self.data["botcontrol"]["status"] == "exit" and last_modified.seconds > 120 and last_modified.seconds != 86399:
+            elif data["botcontrol"]["status"] == "exit" and last_modified.seconds > 120 and last_modified.seconds != 86399:
                 self.logger.info("deleting %s %s", jfile, str(last_modified.seconds))
-                os.remove(os.path.join(self.datafolder, "telegram_data", f"{jfile}.json"))
+                os.remove(jpath)
         self.logger.debug("cleandata complete")
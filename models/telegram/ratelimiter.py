@@ -0,0 +1,39 @@
+""" Telegram Bot Rate Limiter """
+from collections import defaultdict
+from threading import Lock
+from time import monotonic, sleep
+
+
+class TokenBucket:
+    """Thread safe token bucket, acquire() blocks until a token is available"""
+
+    def __init__(self, rate: float, capacity: float = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = monotonic()
+        self.lock = Lock()
+
+    def acquire(self) -> None:
+        """take a token, waiting for the bucket to refill if it is empty"""
+        with self.lock:
+            now = monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # reserve the token now so concurrent callers queue up behind each other
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if wait > 0:
+            sleep(wait)
+
+
+# Telegram allows around 30 messages a second overall and 1 a second per chat
+global_limiter = TokenBucket(29)
+chat_limiters = defaultdict(lambda: TokenBucket(1))
+
+
+def throttle(chat_id) -> None:
+    """wait until a message can be sent to chat_id without hitting flood limits"""
+    global_limiter.acquire()
+    chat_limiters[str(chat_id)].acquire()
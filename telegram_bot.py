@@ -8,17 +8,18 @@ Usage:
 Press Ctrl-C on the command line or send a signal to the process to stop the bot.
 """
 import argparse
+import functools
 
 import os
-import json
-import subprocess
 
 # import logging
 import re
 import urllib.request
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from time import sleep
+from typing import Iterable, Iterator
 
 
 # from pandas.core.frame import DataFrame
@@ -33,7 +34,6 @@ from telegram.ext import (
     MessageHandler,
 )
 from telegram.replykeyboardremove import ReplyKeyboardRemove
-from apscheduler.schedulers.background import BackgroundScheduler
 
 from models.telegram import (
     TelegramControl,
@@ -42,18 +42,76 @@ from models.telegram import (
     TelegramActions,
     ConfigEditor,
     SettingsEditor,
+    load_json_file,
 )
 
-scannerSchedule = BackgroundScheduler(timezone="UTC")
-
 # TYPING_RESPONSE = 1
 CHOOSING, TYPING_REPLY = range(2)
 EXCHANGE, MARKET, ANYOVERRIDES, OVERRIDES, SAVE, START = range(6)
 EXCEPT_EXCHANGE, EXCEPT_MARKET = range(2)
 
-replykeyboard = [["Coinbase Pro", "Binance", "Kucoin"]]
+# exchange keyboard labels and the exchange names used by pycryptobot
+EXCHANGE_NAMES = {"Coinbase Pro": "coinbasepro", "Binance": "binance", "Kucoin": "kucoin"}
+
+replykeyboard = [list(EXCHANGE_NAMES)]
 
 markup = ReplyKeyboardMarkup(replykeyboard, one_time_keyboard=True)
+yes_no_markup = ReplyKeyboardMarkup([["Yes", "No"]], one_time_keyboard=True)
+remove_keyboard = ReplyKeyboardRemove()
+
+# Telegram clients can auto replace -- with a long dash
+EM_DASH = "\u2014"
+EN_DASH = "\u2013"
+
+# exchange output files written by the scanner, e.g. binance_USDT_output.json
+OUTPUT_FILE_RE = re.compile(r"(coinbasepro|binance|kucoin).*output\.json$")
+
+# Telegram messages are limited to 4096 characters
+MESSAGE_CHUNK_SIZE = 3800
+
+
+def chunk_lines(lines: Iterable[str], size: int = MESSAGE_CHUNK_SIZE) -> Iterator[str]:
+    """join lines into chunks of at most size characters, splitting any line longer than that"""
+    chunk, chunk_size = [], 0
+    for line in lines:
+        for start in range(0, len(line), size):
+            part = line[start : start + size]
+            if chunk and chunk_size + len(part) > size:
+                yield "".join(chunk)
+                chunk, chunk_size = [], 0
+            chunk.append(part)
+            chunk_size += len(part)
+    if chunk:
+        yield "".join(chunk)
+
+
+def stream_stats(exchange: str, pairs: str) -> Iterator[str]:
+    """run pycryptobot stats for a group of pairs, yielding the output in message sized chunks"""
+    import subprocess  # pylint: disable=import-outside-toplevel
+
+    with subprocess.Popen(
+        ["python3", "pycryptobot.py", "--stats", "--exchange", exchange, "--statgroup"]
+        + pairs.split(),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+    ) as process:
+        yield from chunk_lines(process.stdout)
+
+
+def require_allowed(func):
+    """only run the handler when called by the authorised user"""
+
+    @functools.wraps(func)
+    def wrapper(self, update, context, *args, **kwargs):
+        if not self._check_if_allowed(
+            context._user_id_and_data[0], update
+        ):  # pylint: disable=protected-access
+            return None
+        return func(self, update, context, *args, **kwargs)
+
+    return wrapper
 
 
 class TelegramBotBase:
@@ -62,6 +120,7 @@ class TelegramBotBase:
     """
 
     userid = ""
+    allowed_ids = frozenset()
     datafolder = os.curdir
     data = {}
 
@@ -70,7 +129,7 @@ class TelegramBotBase:
     editor = None
 
     def _check_if_allowed(self, userid, update) -> bool:
-        if str(userid) != self.userid:
+        if str(userid) not in self.allowed_ids:
             update.message.reply_text("<b>Not authorised!</b>", parse_mode="HTML")
             return False
 
@@ -116,6 +175,7 @@ class TelegramBot(TelegramBotBase):
 
         self.token = self.helper.config["telegram"]["token"]
         self.userid = self.helper.config["telegram"]["user_id"]
+        self.allowed_ids = frozenset([str(self.userid)])
 
         if args.datafolder != "":
             self.helper.datafolder = args.datafolder
@@ -150,6 +210,7 @@ class TelegramBot(TelegramBotBase):
         self.updater = Updater(
             self.token,
             use_context=True,
+            workers=16,
         )
 
         self.handler = TelegramHandler(self.userid, self.helper)
@@ -158,6 +219,9 @@ class TelegramBot(TelegramBotBase):
         self.editor = ConfigEditor(self.helper)
         self.setting = SettingsEditor(self.helper)
 
+        # stats are gathered in child processes, run side by side with at most one per exchange
+        self.stats_pool = ThreadPoolExecutor(max_workers=len(EXCHANGE_NAMES))
+
         if args.datafolder != "":
             self.helper.datafolder = args.datafolder
 
@@ -174,18 +238,12 @@ class TelegramBot(TelegramBotBase):
         """start bot validate exchange and ask which market/pair"""
         if update.message.text.lower() == "cancel":
             update.message.reply_text(
-                "Operation Cancelled", reply_markup=ReplyKeyboardRemove()
+                "Operation Cancelled", reply_markup=remove_keyboard
             )
             return ConversationHandler.END
 
-        if (
-            update.message.text == "Coinbase Pro"
-            or update.message.text == "Kucoin"
-            or update.message.text == "Binance"
-        ):
-            self.exchange = update.message.text.lower()
-            if update.message.text == "Coinbase Pro":
-                self.exchange = "coinbasepro"
+        if update.message.text in EXCHANGE_NAMES:
+            self.exchange = EXCHANGE_NAMES[update.message.text]
         else:
             if self.exchange == "":
                 self.helper.send_telegram_message(
@@ -197,13 +255,13 @@ class TelegramBot(TelegramBotBase):
     def _question_which_pair(self, update, context):
         self.market = ""
         self.helper.send_telegram_message(
-            update, "Which market/pair is this for?", ReplyKeyboardRemove(), context
+            update, "Which market/pair is this for?", remove_keyboard, context
         )
 
     def _answer_which_pair(self, update, context) -> bool:
         if update.message.text.lower() == "cancel":
             self.helper.send_telegram_message(
-                update, "Operation Cancelled", ReplyKeyboardRemove(), context
+                update, "Operation Cancelled", remove_keyboard, context
             )
             return ConversationHandler.END
 
@@ -211,14 +269,14 @@ class TelegramBot(TelegramBotBase):
             p = re.compile(r"^[0-9A-Z]{1,20}\-[1-9A-Z]{2,5}$")
             if not p.match(update.message.text):
                 self.helper.send_telegram_message(
-                    update, "Invalid market format", ReplyKeyboardRemove(), context
+                    update, "Invalid market format", remove_keyboard, context
                 )
                 return False
         elif self.exchange == "binance":
             p = re.compile(r"^[A-Z0-9]{4,25}$")
             if not p.match(update.message.text):
                 self.helper.send_telegram_message(
-                    update, "Invalid market format.", ReplyKeyboardRemove(), context
+                    update, "Invalid market format.", remove_keyboard, context
                 )
                 return False
 
@@ -226,8 +284,7 @@ class TelegramBot(TelegramBotBase):
 
         return True
 
-    # Define command handlers. These usually take the two arguments update and context.
-    def setcommands(self, update, context) -> None:
+    def set_bot_commands(self, update=None, context=None) -> None:
         """Set bot commands in telegram"""
         command = [
             BotCommand("controlpanel", "show command buttons"),
@@ -260,10 +317,17 @@ class TelegramBot(TelegramBotBase):
         self.helper.send_telegram_message(
             update,
             "<i>Bot Commands Created</i>",
-            ReplyKeyboardRemove(),
+            remove_keyboard,
             context=context,
         )
 
+    # Define command handlers. These usually take the two arguments update and context.
+    @require_allowed
+    def setcommands(self, update, context) -> None:
+        """calling /setcommands from Telegram command list"""
+        self.set_bot_commands(update, context)
+
+    @require_allowed
     def help(self, update, context):
         """Send a message when the command /help is issued."""
 
@@ -287,29 +351,22 @@ class TelegramBot(TelegramBotBase):
 
         self.helper.send_telegram_message(update, helptext, context=context)
 
+    @require_allowed
     def trades(self, update, context):
         """List trades"""
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return
-
         self.handler.get_trade_options(None, None)
         return
 
+    @require_allowed
     def statsrequest(self, update: Updater, context):
         """Ask which exchange stats are wanted for"""
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return None
-
         self.helper.send_telegram_message(
             update, "Select the exchange", markup, context=context
         )
 
         return CHOOSING
 
+    @require_allowed
     def stats_exchange_received(self, update, context):
         """Ask which market stats are wanted for"""
         if update.message.text.lower() == "done":
@@ -317,14 +374,12 @@ class TelegramBot(TelegramBotBase):
 
         if update.message.text.lower() == "cancel":
             self.helper.send_telegram_message(
-                update, "Operation Cancelled", ReplyKeyboardRemove(), context=context
+                update, "Operation Cancelled", remove_keyboard, context=context
             )
             return ConversationHandler.END
 
-        if update.message.text in ("Coinbase Pro", "Kucoin", "Binance"):
-            self.exchange = update.message.text.lower()
-            if update.message.text == "Coinbase Pro":
-                self.exchange = "coinbasepro"
+        if update.message.text in EXCHANGE_NAMES:
+            self.exchange = EXCHANGE_NAMES[update.message.text]
         else:
             if self.exchange == "":
                 self.helper.send_telegram_message(
@@ -336,12 +391,13 @@ class TelegramBot(TelegramBotBase):
         self.helper.send_telegram_message(
             update,
             "Which market/pair do you want stats for?",
-            ReplyKeyboardRemove(),
+            remove_keyboard,
             context=context,
         )
 
         return TYPING_REPLY
 
+    @require_allowed
     def stats_pair_received(self, update, context):
         """Show stats for selected exchange and market"""
         if update.message.text.lower() == "done":
@@ -349,7 +405,7 @@ class TelegramBot(TelegramBotBase):
 
         if update.message.text.lower() == "cancel":
             self.helper.send_telegram_message(
-                update, "Operation Cancelled", ReplyKeyboardRemove(), context=context
+                update, "Operation Cancelled", remove_keyboard, context=context
             )
             return ConversationHandler.END
 
@@ -359,7 +415,7 @@ class TelegramBot(TelegramBotBase):
                 self.helper.send_telegram_message(
                     update,
                     "Invalid market format",
-                    ReplyKeyboardRemove(),
+                    remove_keyboard,
                     context=context,
                 )
                 self.stats_exchange_received(update, context)
@@ -370,7 +426,7 @@ class TelegramBot(TelegramBotBase):
                 self.helper.send_telegram_message(
                     update,
                     "Invalid market format",
-                    ReplyKeyboardRemove(),
+                    remove_keyboard,
                     context=context,
                 )
                 self.stats_exchange_received(update, context)
@@ -389,24 +445,16 @@ class TelegramBot(TelegramBotBase):
 
         return ConversationHandler.END
 
+    @require_allowed
     def newbot_request(self, update: Updater, context):
         """start new bot ask which exchange"""
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return None
-
         self._question_which_exchange(update, context)
 
         return EXCHANGE
 
+    @require_allowed
     def newbot_exchange(self, update, context):
         """start bot validate exchange and ask which market/pair"""
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return None
-
         if not self._answer_which_exchange(update, context):
             self.newbot_request(update, context)
 
@@ -414,78 +462,55 @@ class TelegramBot(TelegramBotBase):
 
         return ANYOVERRIDES
 
+    @require_allowed
     def newbot_any_overrides(self, update, context) -> None:
         """start bot validate market and ask if overrides required"""
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return None
-
         if not self._answer_which_pair(update, context):
             self.newbot_exchange(update, context)
             return None
 
-        r_keyboard = [["Yes", "No"]]
-
-        mark_up = ReplyKeyboardMarkup(r_keyboard, one_time_keyboard=True)
-
         self.helper.send_telegram_message(
-            update, "Do you want to use any commandline overrides?", mark_up, context
+            update, "Do you want to use any commandline overrides?", yes_no_markup, context
         )
 
         return MARKET
 
+    @require_allowed
     def newbot_market(self, update, context):
         """start bot - ask for overrides if none required ask to save bot"""
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return None
-
         if update.message.text == "No":
-            reply_keyboard = [["Yes", "No"]]
-            mark_up = ReplyKeyboardMarkup(reply_keyboard, one_time_keyboard=True)
             self.helper.send_telegram_message(
-                update, "Do you want to save this?", mark_up, context
+                update, "Do you want to save this?", yes_no_markup, context
             )
             return SAVE
 
         self.helper.send_telegram_message(
             update,
             "Tell me any other commandline overrides to use?",
-            ReplyKeyboardRemove(),
+            remove_keyboard,
             context,
         )
 
         return OVERRIDES
 
+    @require_allowed
     def newbot_overrides(self, update, context):
         """start bot - ask to save bot"""
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return None
-
         # Telegram desktop client can auto replace -- with a single long dash
         # this converts it back to --
-        self.overrides = update.message.text.replace(
-            b"\xe2\x80\x94".decode("utf-8"), "--"
+        self.overrides = update.message.text.replace(EM_DASH, "--").replace(
+            EN_DASH, "--"
         )
 
-        reply_keyboard = [["Yes", "No"]]
-        mark_up = ReplyKeyboardMarkup(reply_keyboard, one_time_keyboard=True)
         self.helper.send_telegram_message(
-            update, "Do you want to save this?", mark_up, context
+            update, "Do you want to save this?", yes_no_markup, context
         )
 
         return SAVE
 
+    @require_allowed
     def newbot_save(self, update, context):
         """start bot - save if required ask if want to start"""
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return None
         self.helper.logger.info("called newbot_save")
         if update.message.text == "Yes":
             write_ok, try_count = False, 0
@@ -535,26 +560,20 @@ class TelegramBot(TelegramBotBase):
                 except Exception as err:  # pylint: disable=broad-except
                     print(err)
 
-        reply_keyboard = [["Yes", "No"]]
-        mark_up = ReplyKeyboardMarkup(reply_keyboard, one_time_keyboard=True)
         self.helper.send_telegram_message(
-            update, "Do you want to start this bot?", mark_up, context
+            update, "Do you want to start this bot?", yes_no_markup, context
         )
 
         return START
 
+    @require_allowed
     def newbot_start(self, update, context, startmethod: str = "telegram") -> None:
         """start bot - start bot if want"""
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return None
-
         if update.message.text == "No":
             self.helper.send_telegram_message(
                 update,
                 "Command Complete, have a nice day.",
-                ReplyKeyboardRemove(),
+                remove_keyboard,
                 context,
             )
             return ConversationHandler.END
@@ -568,7 +587,7 @@ class TelegramBot(TelegramBotBase):
             self.helper.send_telegram_message(
                 update,
                 f"{self.pair} is already running, no action taken.",
-                ReplyKeyboardRemove(),
+                remove_keyboard,
                 context,
             )
         else:
@@ -576,12 +595,12 @@ class TelegramBot(TelegramBotBase):
                 self.helper.send_telegram_message(
                     update,
                     f"{self.pair} crypto bot Starting",
-                    ReplyKeyboardRemove(),
+                    remove_keyboard,
                     context,
                 )
 
         self.helper.send_telegram_message(
-            update, "Command Complete, have a nice day.", ReplyKeyboardRemove(), context
+            update, "Command Complete, have a nice day.", remove_keyboard, context
         )
 
         return ConversationHandler.END
@@ -627,31 +646,24 @@ class TelegramBot(TelegramBotBase):
             print("No internet connection")
             return False
 
+    @require_allowed
     def exception_exchange(self, update, context):
         """start new bot ask which exchange"""
         self._question_which_exchange(update, context)
 
         return EXCEPT_EXCHANGE
 
+    @require_allowed
     def exception_pair(self, update, context):
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return
-
         self._answer_which_exchange(update, context)
 
         self._question_which_pair(update, context)
 
         return EXCEPT_MARKET
 
+    @require_allowed
     def exception_add(self, update, context):
         """start bot - save if required ask if want to start"""
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return None
-
         self.helper.logger.info("called exception_add")
 
         self._answer_which_pair(update, context)
@@ -672,123 +684,106 @@ class TelegramBot(TelegramBotBase):
             self.helper.send_telegram_message(
                 update,
                 f"{self.pair} Added to Scanner Exception List \u2705",
-                ReplyKeyboardRemove(),
+                remove_keyboard,
                 context,
             )
         else:
             self.helper.send_telegram_message(
                 update,
                 f"{self.pair} Already on exception list",
-                ReplyKeyboardRemove(),
+                remove_keyboard,
                 context,
             )
 
         return ConversationHandler.END
 
+    @require_allowed
     def exception_remove(self, update, context):
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return
-
         self.control.ask_exception_bot_list(update, context)
         return
 
+    @require_allowed
     def marginrequest(self, update, context):
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return
-
         self.handler.ask_margin_type(None, context)
         return
 
+    @require_allowed
     def deleterequest(self, update, context):
         """ask which bot to delete"""
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return
-
         self.control.ask_delete_bot_list(update, context)
 
+    @require_allowed
     def scanning(self, update, context):
         """calling /startscanner from Telegram command list"""
-        if not self._check_if_allowed(context._user_id_and_data[0], update):
-            return
-
         self.handler.get_scanner_options(None)
         return
 
+    @require_allowed
     def cleandata(self, update, context) -> None:
         """calling /cleandata from Telegram command list"""
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return
-
         self.helper.clean_data_folder()
 
         self.actions.get_bot_info(None, context)
         self.helper.send_telegram_message(update, "<b>Operation Complete</b>", context=context)
 
-    def statstwo(self, update, context):
-        jsonfiles = os.listdir(os.path.join(self.helper.datafolder, "telegram_data"))
-        for file in jsonfiles:
-            exchange = "coinbasepro"
-            if file.__contains__("output.json"):
-                if file.__contains__("coinbasepro"):
-                    exchange = "coinbasepro"
-                if file.__contains__("binance"):
-                    exchange = "binance"
-                if file.__contains__("kucoin"):
-                    exchange = "kucoin"
-
+    def _send_stats(self, update, context, exchange: str, pair_groups: list) -> None:
+        """send stats output to telegram as it is produced, one pair group after another"""
+        # exchanges run side by side, so label each message with the exchange it is for
+        for pairs in pair_groups:
+            for chunk in stream_stats(exchange, pairs):
                 self.helper.send_telegram_message(
-                    update, "<i>Gathering Stats, please wait...</i>", context=context
+                    update, f"<b>{exchange}</b>\n{chunk}", context=context
                 )
 
-                with open(
-                    os.path.join(self.helper.datafolder, "telegram_data", file),
-                    "r",
-                    encoding="utf8",
-                ) as json_file:
-                    data = json.load(json_file)
+    @require_allowed
+    def statstwo(self, update, context):
+        outputs = []
+        tg_dir = os.path.join(self.helper.datafolder, "telegram_data")
+        with os.scandir(tg_dir) as entries:
+            for entry in entries:
+                match = OUTPUT_FILE_RE.search(entry.name)
+                if match:
+                    outputs.append((match.group(1), entry.path))
+
+        if len(outputs) > 0:
+            self.helper.send_telegram_message(
+                update, "<i>Gathering Stats, please wait...</i>", context=context
+            )
 
-                pairs = ""
-                for pair in data:
-                    if pair.__contains__("DOWN") or pair.__contains__("UP"):
-                        continue
+        # load all the output files at once, then start one stats job per exchange. each stats
+        # run spaces out its own order queries, so an exchange's output files (e.g. USDT and
+        # BUSD) run one after the other rather than querying the same account side by side
+        pair_groups = {}
+        datas = self.stats_pool.map(load_json_file, [path for _, path in outputs])
+        for (exchange, _), data in zip(outputs, datas):
+            pair_groups.setdefault(exchange, []).append(
+                " ".join(
+                    pair for pair in data.keys() if "DOWN" not in pair and "UP" not in pair
+                )
+            )
 
-                    # count += 1
-                    pairs = pairs + pair + " "
+        jobs = [
+            self.stats_pool.submit(self._send_stats, update, context, exchange, groups)
+            for exchange, groups in pair_groups.items()
+        ]
 
-                output = subprocess.getoutput(
-                    f"python3 pycryptobot.py --stats --exchange {exchange}  --statgroup {pairs}  "
-                )
-                self.helper.send_telegram_message(update, output, context=context)
-                sleep(30)
-                self.helper.send_telegram_message(
-                    update, "Pausing before next set", context=context
-                )
+        for job in jobs:
+            job.result()
 
+    @require_allowed
     def get_bot_list(self, update, context):
-        if not self._check_if_allowed(
-            context._user_id_and_data[0], update
-        ):  # pylint: disable=protected-access
-            return None
-
         # self.handler.get_bot_options(update)
         # return
 
-        buttons = []
-
-        for market in self.helper.get_active_bot_list("active"):
-            read_ok = self.helper.read_data(market)
-            if read_ok and "botcontrol" in self.helper.data:
-                buttons.append(
-                    InlineKeyboardButton(market, callback_data=f"bot_{market}")
-                )
+        datas = {
+            market: self.helper.get_bot_data(market)
+            for market in self.helper.get_active_bot_list("active")
+        }
+        buttons = [
+            InlineKeyboardButton(market, callback_data=f"bot_{market}")
+            for market, data in datas.items()
+            if data and "botcontrol" in data
+        ]
 
         if len(buttons) > 0:
             self.helper.send_telegram_message(
@@ -802,15 +797,13 @@ class TelegramBot(TelegramBotBase):
                 update, "<b>No bots found.</b>", context=context
             )
 
+    @require_allowed
     def request(self, update, context):
-        userid = context._user_id_and_data[0]  # pylint: disable=protected-access
-
-        if self._check_if_allowed(userid, update):
-            self.helper.load_config()
-            key_markup = self.handler.get_request()
-            self.helper.send_telegram_message(
-                update, "<b>PyCryptoBot Command Panel.</b>", key_markup, context
-            )
+        self.helper.load_config()
+        key_markup = self.handler.get_request()
+        self.helper.send_telegram_message(
+            update, "<b>PyCryptoBot Command Panel.</b>", key_markup, context
+        )
 
 
 def main():
@@ -820,41 +813,33 @@ def main():
     # Get the dispatcher to register handlers
     dp = botconfig.updater.dispatcher
 
-    # Information commands
-    dp.add_handler(CommandHandler("help", botconfig.help))
-    dp.add_handler(CommandHandler("margins", botconfig.marginrequest, Filters.all))
-    dp.add_handler(CommandHandler("trades", botconfig.trades, Filters.text))
-
-    # General Action Command
-    dp.add_handler(CommandHandler("setcommands", botconfig.setcommands))
-    dp.add_handler(
-        CommandHandler("scanner", botconfig.scanning, Filters.text)
-    )
-    dp.add_handler(CommandHandler("cleandata", botconfig.cleandata, Filters.text))
-    dp.add_handler(
-        CommandHandler("removeexception", botconfig.exception_remove, Filters.text)
-    )
+    # only handlers that never touch the shared helper.data run on worker threads,
+    # everything else stays on the dispatcher thread so bot file updates can't interleave
+    commands = [
+        # Information commands
+        ("help", botconfig.help, None, False),
+        ("margins", botconfig.marginrequest, Filters.all, False),
+        ("trades", botconfig.trades, Filters.text, False),
+        # General Action Command
+        ("setcommands", botconfig.setcommands, None, False),
+        ("scanner", botconfig.scanning, Filters.text, False),
+        ("cleandata", botconfig.cleandata, Filters.text, False),
+        ("removeexception", botconfig.exception_remove, Filters.text, False),
+        ("ex", botconfig.get_bot_list, None, True),
+        ("statsgroup", botconfig.statstwo, None, True),
+        ("controlPanel", botconfig.request, None, False),
+    ]
+    for command, callback, filters, run_async in commands:
+        dp.add_handler(CommandHandler(command, callback, filters, run_async=run_async))
 
-    dp.add_handler(CommandHandler("ex", botconfig.get_bot_list))
-    dp.add_handler(CommandHandler("statsgroup", botconfig.statstwo))
     # Response to Question handler
     dp.add_handler(CallbackQueryHandler(botconfig.handler.get_response))
 
-    dp.add_handler(CommandHandler("controlPanel", botconfig.request))
-
     conversation_exception = ConversationHandler(
         entry_points=[CommandHandler("addexception", botconfig.exception_exchange)],
         states={
-            EXCEPT_EXCHANGE: [
-                MessageHandler(
-                    Filters.text, botconfig.exception_pair, pass_user_data=True
-                )
-            ],
-            EXCEPT_MARKET: [
-                MessageHandler(
-                    Filters.text, botconfig.exception_add, pass_user_data=True
-                )
-            ],
+            EXCEPT_EXCHANGE: [MessageHandler(Filters.text, botconfig.exception_pair)],
+            EXCEPT_MARKET: [MessageHandler(Filters.text, botconfig.exception_add)],
         },
         fallbacks=[("Done", botconfig.done)],
     )
@@ -862,16 +847,8 @@ def main():
     conversation_stats = ConversationHandler(
         entry_points=[CommandHandler("stats", botconfig.statsrequest)],
         states={
-            CHOOSING: [
-                MessageHandler(
-                    Filters.text, botconfig.stats_exchange_received, pass_user_data=True
-                )
-            ],
-            TYPING_REPLY: [
-                MessageHandler(
-                    Filters.text, botconfig.stats_pair_received, pass_user_data=True
-                )
-            ],
+            CHOOSING: [MessageHandler(Filters.text, botconfig.stats_exchange_received)],
+            TYPING_REPLY: [MessageHandler(Filters.text, botconfig.stats_pair_received)],
         },
         fallbacks=[("Done", botconfig.done)],
     )
@@ -902,7 +879,7 @@ def main():
     # Start the Bot
     botconfig.updater.start_polling()
     botconfig.helper.logger.info("Telegram Bot is listening")
-    botconfig.setcommands(None, None)
+    botconfig.set_bot_commands()
     botconfig.updater.bot.send_message(
         text="Online and ready.", chat_id=botconfig.helper.config["telegram"]["user_id"]
     )
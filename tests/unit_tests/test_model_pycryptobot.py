@@ -0,0 +1,481 @@
+import functools, json, pytest, re
+from pathlib import Path
+
+# pylint: disable=import-error
+from models.exchange.ExchangesEnum import Exchange
+
+try:
+    import orjson
+
+    _dumps, _loads = orjson.dumps, orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode("utf8")
+
+    _loads = json.loads
+
+
+_ZERO64 = "0" * 64
+_ZERO32 = "0" * 32
+_CB_SECRET = "0000/" + "0" * 10 + "/" + "0" * 58 + "/" + "0" * 11 + "=="
+_CB_PASS = "0" * 11
+
+
+def _binance_cfg(**overrides):
+    config = {
+        "binance": {
+            "api_url": "https://api.binance.com",
+            "api_key": _ZERO64,
+            "api_secret": _ZERO64,
+        }
+    }
+    config["binance"].update(overrides)
+    return config
+
+
+def _coinbasepro_cfg(**overrides):
+    config = {
+        "coinbasepro": {
+            "api_url": "https://api.pro.coinbase.com",
+            "api_key": _ZERO32,
+            "api_secret": _CB_SECRET,
+            "api_passphrase": _CB_PASS,
+        }
+    }
+    config["coinbasepro"].update(overrides)
+    return config
+
+
+_CFG_BUILDERS = {"binance": _binance_cfg, "coinbasepro": _coinbasepro_cfg}
+
+
+def _key_file_cfg(config, exchange, key_dir):
+    """move the inline keys into a key file, the bot migrates inline keys in a config file into ./<exchange>.key"""
+    section = config[exchange]
+    key_file = key_dir / f"{exchange}.key"
+    key_file.write_text("\n".join(section.pop(field) for field in ("api_key", "api_secret", "api_passphrase") if field in section))
+    section["api_key_file"] = str(key_file)
+    return config
+
+
+@pytest.fixture(scope="session")
+def cfg_dir(request, tmp_path_factory):
+    """one config directory per xdist worker, "master" when xdist is not in use"""
+    worker_id = getattr(request.config, "workerinput", {}).get("workerid", "master")
+    return tmp_path_factory.mktemp(f"cfg_{worker_id}")
+
+
+@pytest.fixture(scope="module")
+def PyCryptoBot():  # pylint: disable=invalid-name
+    """imported on first use so collecting this module does not pull in the whole bot"""
+    from controllers.PyCryptoBot import PyCryptoBot as _PyCryptoBot
+
+    return _PyCryptoBot
+
+
+def _make_app(bot_cls, cfg_dir, exchange, config):
+    path = cfg_dir / f"{exchange}.json"
+    path.write_bytes(_dumps(_key_file_cfg(config, exchange, cfg_dir)))
+    return bot_cls(exchange=exchange, config_file=str(path))
+
+
+@pytest.fixture(scope="module")
+def binance_app(PyCryptoBot, cfg_dir):
+    return _make_app(PyCryptoBot, cfg_dir, 'binance', _binance_cfg(config={}))
+
+
+@pytest.fixture(scope="module")
+def coinbasepro_app(PyCryptoBot, cfg_dir):
+    return _make_app(PyCryptoBot, cfg_dir, 'coinbasepro', _coinbasepro_cfg(config={}))
+
+
+@pytest.fixture
+def cfg_path(cfg_dir):
+    return cfg_dir / "pytest_config.json"
+
+
+def _granularity_config(exchange, granularity, key_dir):
+    return _dumps(_key_file_cfg(_CFG_BUILDERS[exchange](config={"granularity": granularity}), exchange, key_dir))
+
+
+@functools.lru_cache(maxsize=1)
+def _load_root_config():
+    """config.json is not modified by the tests, so parse it once per session"""
+    return _loads(Path('config.json').read_bytes())
+
+
+@pytest.fixture(scope="module")
+def ensure_config_json(cfg_dir):
+    """create a valid config.json for the tests that read it, removing it afterwards if it was ours"""
+    path = Path('config.json')
+    created = not path.exists()
+
+    if created:
+        config = {
+            **_key_file_cfg(_binance_cfg(), 'binance', cfg_dir),
+            **_key_file_cfg(_coinbasepro_cfg(), 'coinbasepro', cfg_dir),
+        }
+        path.write_bytes(_dumps(config))
+
+    yield
+
+    if created:
+        path.unlink()
+
+
+def test_instantiate_model_without_error(ensure_config_json, PyCryptoBot):
+    app = PyCryptoBot(config_file='config.json')
+    assert type(app) is PyCryptoBot
+    assert app.config_file == 'config.json'
+
+    config_json = _load_root_config()
+
+    # PyCryptoBot(exchange=...) reads the default config.json
+    for name in ('binance', 'coinbasepro', 'dummy'):
+        if name in config_json:
+            app = PyCryptoBot(exchange=name)
+            assert app.exchange == Exchange(name)
+
+def test_configjson_binance(binance_app):
+    assert binance_app.exchange == Exchange.BINANCE
+
+def test_configjson_coinbasepro(coinbasepro_app):
+    assert coinbasepro_app.exchange == Exchange.COINBASEPRO
+
+def test_configjson_coinbasepro_legacy(cfg_path, PyCryptoBot):
+    config = _coinbasepro_cfg()["coinbasepro"]
+
+    cfg_path.write_bytes(_dumps(config))
+
+    app = PyCryptoBot(exchange='coinbasepro', config_file=str(cfg_path))
+    assert app.exchange == Exchange.COINBASEPRO
+
+@pytest.mark.parametrize("exchange,field,exc,msg", [
+    ('binance', 'api_url', ValueError, 'Binance API URL is invalid'),
+    ('binance', 'api_key', TypeError, 'Binance API key is invalid'),
+    ('binance', 'api_secret', TypeError, 'Binance API secret is invalid'),
+    ('coinbasepro', 'api_url', ValueError, 'Coinbase Pro API URL is invalid'),
+    ('coinbasepro', 'api_key', TypeError, 'Coinbase Pro API key is invalid'),
+    ('coinbasepro', 'api_secret', TypeError, 'Coinbase Pro API secret is invalid'),
+    ('coinbasepro', 'api_passphrase', TypeError, 'Coinbase Pro API passphrase is invalid'),
+])
+def test_configjson_invalid_api_field(exchange, field, exc, msg, PyCryptoBot):
+    config = _CFG_BUILDERS[exchange](**{field: "ERROR"})
+    with pytest.raises(exc, match=re.escape(msg)):
+        PyCryptoBot(exchange=exchange, config_dict=config)
+
+@pytest.mark.parametrize("granularity,expected", [
+    ('1m', 60), ('5m', 300), ('15m', 900), ('1h', 3600), ('6h', 21600), ('1d', 86400), (60, 60)
+])
+def test_configjson_binance_granularity(granularity, expected, cfg_path, PyCryptoBot):
+    cfg_path.write_bytes(_granularity_config('binance', granularity, cfg_path.parent))
+
+    app = PyCryptoBot(exchange='binance', config_file=str(cfg_path))
+    assert app.exchange == Exchange.BINANCE
+    assert app.granularity.to_integer == expected
+
+def test_configjson_binance_invalid_granularity(cfg_path, PyCryptoBot):
+    cfg_path.write_bytes(_granularity_config('binance', '2m', cfg_path.parent))
+
+    with pytest.raises(ValueError, match=re.escape('Invalid Granularity')):
+        PyCryptoBot(exchange='binance', config_file=str(cfg_path))
+
+@pytest.mark.parametrize("granularity,expected", [
+    (60, 60), (300, 300), (900, 900), (3600, 3600), (21600, 21600), (86400, 86400), ('1h', 3600)
+])
+def test_configjson_coinbasepro_granularity(granularity, expected, cfg_path, PyCryptoBot):
+    cfg_path.write_bytes(_granularity_config('coinbasepro', granularity, cfg_path.parent))
+
+    app = PyCryptoBot(exchange='coinbasepro', config_file=str(cfg_path))
+    assert app.exchange == Exchange.COINBASEPRO
+    assert app.granularity.to_integer == expected
+
+def test_configjson_coinbasepro_invalid_granularity(cfg_path, PyCryptoBot):
+    cfg_path.write_bytes(_granularity_config('coinbasepro', 120, cfg_path.parent))
+
+    with pytest.raises(ValueError, match=re.escape('Invalid Granularity')):
+        PyCryptoBot(exchange='coinbasepro', config_file=str(cfg_path))
+
+def test_configjson_binance_islive(binance_app, PyCryptoBot):
+    assert not binance_app.is_live
+
+    config = _binance_cfg(config={})
+
+    config['binance']['config']['live'] = 1
+    app = PyCryptoBot(exchange='binance', config_dict=config)
+    assert app.is_live
+
+def test_configjson_coinbasepro_islive(coinbasepro_app, PyCryptoBot):
+    assert not coinbasepro_app.is_live
+
+    config = _coinbasepro_cfg(config={})
+
+    config['coinbasepro']['config']['live'] = 1
+    app = PyCryptoBot(exchange='coinbasepro', config_dict=config)
+    assert app.is_live
+
+def test_configjson_binance_graphs(binance_app, PyCryptoBot):
+    assert not binance_app.save_graphs
+
+    config = _binance_cfg(config={})
+
+    config['binance']['config']['graphs'] = 1
+    app = PyCryptoBot(exchange='binance', config_dict=config)
+    assert app.exchange == Exchange.BINANCE
+    assert app.save_graphs
+
+def test_configjson_coinbasepro_graphs(coinbasepro_app, PyCryptoBot):
+    assert not coinbasepro_app.save_graphs
+
+    config = _coinbasepro_cfg(config={})
+
+    config['coinbasepro']['config']['graphs'] = 1
+    app = PyCryptoBot(exchange='coinbasepro', config_dict=config)
+    assert app.exchange == Exchange.COINBASEPRO
+    assert app.save_graphs
+
+def test_configjson_binance_isverbose(binance_app, PyCryptoBot):
+    assert not binance_app.is_verbose
+
+    config = _binance_cfg(config={})
+
+    config['binance']['config']['verbose'] = 1
+    app = PyCryptoBot(exchange='binance', config_dict=config)
+    assert app.exchange == Exchange.BINANCE
+    assert app.is_verbose
+
+def test_configjson_coinbasepro_isverbose(coinbasepro_app, PyCryptoBot):
+    assert not coinbasepro_app.is_verbose
+
+    config = _coinbasepro_cfg(config={})
+
+    config['coinbasepro']['config']['verbose'] = 1
+    app = PyCryptoBot(exchange='coinbasepro', config_dict=config)
+    assert app.exchange == Exchange.COINBASEPRO
+    assert app.is_verbose
+
+def test_configjson_binance_sellatloss(PyCryptoBot):
+    config = _binance_cfg(config={})
+
+    app = PyCryptoBot(exchange='binance', config_dict=config)
+    assert app.exchange == Exchange.BINANCE
+    assert app.sellatloss
+
+    config['binance']['config']['sellatloss'] = 0
+    app = PyCryptoBot(exchange='binance', config_dict=config)
+    assert app.exchange == Exchange.BINANCE
+    assert not app.sellatloss
+
+def test_configjson_coinbasepro_sellatloss(PyCryptoBot):
+    config = _coinbasepro_cfg(config={})
+
+    app = PyCryptoBot(exchange='coinbasepro', config_dict=config)
+    assert app.exchange == Exchange.COINBASEPRO
+    assert app.sellatloss
+
+    config['coinbasepro']['config']['sellatloss'] = 0
+    app = PyCryptoBot(exchange='coinbasepro',config_dict=config)
+    assert app.exchange == Exchange.COINBASEPRO
+    assert not app.sellatloss
+
+def test_configjson_binance_sell_upper_pcnt(PyCryptoBot):
+    config = _binance_cfg(config={})
+
+    app = PyCryptoBot(exchange='binance', config_dict=config)
+    assert app.exchange == Exchange.BINANCE
+    assert app.sell_upper_pcnt is None
+
+    config['binance']['config']['sellupperpcnt'] = 10
+    app = PyCryptoBot(exchange='binance', config_dict=config)
+    assert app.exchange == Exchange.BINANCE
+    assert isinstance(app.sell_upper_pcnt, float)
+    assert app.sell_upper_pcnt == 10
+
+    config['binance']['config']['sellupperpcnt'] = 10.5
+    app = PyCryptoBot(exchange='binance', config_dict=config)
+    assert app.exchange == Exchange.BINANCE
+    assert isinstance(app.sell_upper_pcnt, float)
+    assert app.sell_upper_pcnt == 10.5
+
+    config['binance']['config']['sellupperpcnt'] = '10.5'
+    with pytest.raises(TypeError, match=re.escape('sellupperpcnt must be a number')):
+        PyCryptoBot(exchange='binance', config_dict=config)
+
+    config['binance']['config']['sellupperpcnt'] = -0.1
+    with pytest.raises(TypeError, match=re.escape('sellupperpcnt is out of bounds')):
+        PyCryptoBot(exchange='binance', config_dict=config)
+
+    config['binance']['config']['sellupperpcnt'] = -1
+    with pytest.raises(TypeError, match=re.escape('sellupperpcnt is out of bounds')):
+        PyCryptoBot(exchange='binance', config_dict=config)
+
+    config['binance']['config']['sellupperpcnt'] = 100.1
+    with pytest.raises(TypeError, match=re.escape('sellupperpcnt is out of bounds')):
+        PyCryptoBot(exchange='binance', config_dict=config)
+
+def test_configjson_coinbasepro_sell_upper_pcnt(PyCryptoBot):
+    config = _coinbasepro_cfg(config={})
+
+    app = PyCryptoBot(exchange='coinbasepro', config_dict=config)
+    assert app.exchange == Exchange.COINBASEPRO
+    assert app.sell_upper_pcnt is None
+
+    config['coinbasepro']['config']['sellupperpcnt'] = 10
+    app = PyCryptoBot(exchange='coinbasepro', config_dict=config)
+    assert app.exchange == Exchange.COINBASEPRO
+    assert isinstance(app.sell_upper_pcnt, float)
+    assert app.sell_upper_pcnt == 10
+
+    config['coinbasepro']['config']['sellupperpcnt'] = 10.5
+    app = PyCryptoBot(exchange='coinbasepro', config_dict=config)
+    assert app.exchange == Exchange.COINBASEPRO
+    assert isinstance(app.sell_upper_pcnt, float)
+    assert app.sell_upper_pcnt == 10.5
+
+    config['coinbasepro']['config']['sellupperpcnt'] = '10.5'
+    with pytest.raises(TypeError, match=re.escape('sellupperpcnt must be a number')):
+        PyCryptoBot(exchange='coinbasepro', config_dict=config)
+
+    config['coinbasepro']['config']['sellupperpcnt'] = -0.1
+    with pytest.raises(TypeError, match=re.escape('sellupperpcnt is out of bounds')):
+        PyCryptoBot(exchange='coinbasepro', config_dict=config)
+
+    config['coinbasepro']['config']['sellupperpcnt'] = -1
+    with pytest.raises(TypeError, match=re.escape('sellupperpcnt is out of bounds')):
+        PyCryptoBot(exchange='coinbasepro', config_dict=config)
+
+    config['coinbasepro']['config']['sellupperpcnt'] = 100.1
+    with pytest.raises(TypeError, match=re.escape('sellupperpcnt is out of bounds')):
+        PyCryptoBot(exchange='coinbasepro', config_dict=config)
+
+def test_configjson_binance_sell_lower_pcnt(PyCryptoBot):
+    config = _binance_cfg(config={})
+
+    app = PyCryptoBot(exchange='binance', config_dict=config)
+    assert app.exchange == Exchange.BINANCE
+    assert app.sell_lower_pcnt is None
+
+    config['binance']['config']['selllowerpcnt'] = -10
+    app = PyCryptoBot(exchange='binance', config_dict=config)
+    assert app.exchange == Exchange.BINANCE
+    assert isinstance(app.sell_lower_pcnt, float)
+    assert app.sell_lower_pcnt == -10
+
+    config['binance']['config']['selllowerpcnt'] = -10.5
+    app = PyCryptoBot(exchange='binance', config_dict=config)
+    assert app.exchange == Exchange.BINANCE
+    assert isinstance(app.sell_lower_pcnt, float)
+    assert app.sell_lower_pcnt == -10.5
+
+    config['binance']['config']['selllowerpcnt'] = '-10.5'
+    with pytest.raises(TypeError, match=re.escape('selllowerpcnt must be a number')):
+        PyCryptoBot(exchange='binance', config_dict=config)
+
+    config['binance']['config']['selllowerpcnt'] = 0.1
+    with pytest.raises(TypeError, match=re.escape('selllowerpcnt is out of bounds')):
+        PyCryptoBot(exchange='binance', config_dict=config)
+
+    config['binance']['config']['selllowerpcnt'] = 1
+    with pytest.raises(TypeError, match=re.escape('selllowerpcnt is out of bounds')):
+        PyCryptoBot(exchange='binance', config_dict=config)
+
+    config['binance']['config']['selllowerpcnt'] = -100.1
+    with pytest.raises(TypeError, match=re.escape('selllowerpcnt is out of bounds')):
+        PyCryptoBot(exchange='binance', config_dict=config)
+
+def test_configjson_coinbasepro_sell_lower_pcnt(PyCryptoBot):
+    config = _coinbasepro_cfg(config={})
+
+    app = PyCryptoBot(exchange='coinbasepro', config_dict=config)
+    assert app.exchange == Exchange.COINBASEPRO
+    assert app.sell_lower_pcnt is None
+
+    config['coinbasepro']['config']['selllowerpcnt'] = -10
+    app = PyCryptoBot(exchange='coinbasepro', config_dict=config)
+    assert app.exchange == Exchange.COINBASEPRO
+    assert isinstance(app.sell_lower_pcnt, float)
+    assert app.sell_lower_pcnt == -10
+
+    config['coinbasepro']['config']['selllowerpcnt'] = -10.5
+    app = PyCryptoBot(exchange='coinbasepro', config_dict=config)
+    assert app.exchange == Exchange.COINBASEPRO
+    assert isinstance(app.sell_lower_pcnt, float)
+    assert app.sell_lower_pcnt == -10.5
+
+    config['coinbasepro']['config']['selllowerpcnt'] = '-10.5'
+    with pytest.raises(TypeError, match=re.escape('selllowerpcnt must be a number')):
+        PyCryptoBot(exchange='coinbasepro', config_dict=config)
+
+    config['coinbasepro']['config']['selllowerpcnt'] = 0.1
+    with pytest.raises(TypeError, match=re.escape('selllowerpcnt is out of bounds')):
+        PyCryptoBot(exchange='coinbasepro', config_dict=config)
+
+    config['coinbasepro']['config']['selllowerpcnt'] = 1
+    with pytest.raises(TypeError, match=re.escape('selllowerpcnt is out of bounds')):
+        PyCryptoBot(exchange='coinbasepro', config_dict=config)
+
+    config['coinbasepro']['config']['selllowerpcnt'] = -100.1
+    with pytest.raises(TypeError, match=re.escape('selllowerpcnt is out of bounds')):
+        PyCryptoBot(exchange='coinbasepro', config_dict=config)
+
+def test_configjson_binance_trailingstoploss(PyCryptoBot):
+    config = _binance_cfg(config={})
+
+    app = PyCryptoBot(exchange='binance', config_dict=config)
+    assert app.exchange == Exchange.BINANCE
+    assert app.trailing_stop_loss == 0.0
+
+    config['binance']['config']['trailingstoploss'] = -10
+    app = PyCryptoBot(exchange='binance', config_dict=config)
+    assert app.exchange == Exchange.BINANCE
+    assert isinstance(app.trailing_stop_loss, float)
+    assert app.trailing_stop_loss == -10
+
+    config['binance']['config']['trailingstoploss'] = -10.5
+    app = PyCryptoBot(exchange='binance', config_dict=config)
+    assert app.exchange == Exchange.BINANCE
+    assert isinstance(app.trailing_stop_loss, float)
+    assert app.trailing_stop_loss == -10.5
+
+    config['binance']['config']['trailingstoploss'] = '-10.5'
+    with pytest.raises(TypeError, match=re.escape('trailingstoploss must be a number')):
+        PyCryptoBot(exchange='binance', config_dict=config)
+
+    config['binance']['config']['trailingstoploss'] = 0.1
+    with pytest.raises(TypeError, match=re.escape('trailingstoploss is out of bounds')):
+        PyCryptoBot(exchange='binance', config_dict=config)
+
+    config['binance']['config']['trailingstoploss'] = 1
+    with pytest.raises(TypeError, match=re.escape('trailingstoploss is out of bounds')):
+        PyCryptoBot(exchange='binance', config_dict=config)
+
+def test_configjson_coinbasepro_trailingstoploss(PyCryptoBot):
+    config = _coinbasepro_cfg(config={})
+
+    app = PyCryptoBot(exchange='coinbasepro', config_dict=config)
+    assert app.exchange == Exchange.COINBASEPRO
+    assert app.trailing_stop_loss == 0.0
+
+    config['coinbasepro']['config']['trailingstoploss'] = -10
+    app = PyCryptoBot(exchange='coinbasepro', config_dict=config)
+    assert app.exchange == Exchange.COINBASEPRO
+    assert isinstance(app.trailing_stop_loss, float)
+    assert app.trailing_stop_loss == -10
+
+    config['coinbasepro']['config']['trailingstoploss'] = -10.5
+    app = PyCryptoBot(exchange='coinbasepro', config_dict=config)
+    assert app.exchange == Exchange.COINBASEPRO
+    assert isinstance(app.trailing_stop_loss, float)
+    assert app.trailing_stop_loss == -10.5
+
+    config['coinbasepro']['config']['trailingstoploss'] = '-10.5'
+    with pytest.raises(TypeError, match=re.escape('trailingstoploss must be a number')):
+        PyCryptoBot(exchange='coinbasepro', config_dict=config)
+
+    config['coinbasepro']['config']['trailingstoploss'] = 0.1
+    with pytest.raises(TypeError, match=re.escape('trailingstoploss is out of bounds')):
+        PyCryptoBot(exchange='coinbasepro', config_dict=config)
+
+    config['coinbasepro']['config']['trailingstoploss'] = 1
+    with pytest.raises(TypeError, match=re.escape('trailingstoploss is out of bounds')):
+        PyCryptoBot(exchange='coinbasepro', config_dict=config)
@@ -1,10 +1,18 @@
+import json
 import os
 import sys
+import time
 import unittest
+import unittest.mock
+import pytest
+from telegram.error import RetryAfter
 # pylint: disable=import-error
 from models.telegram import (
     Wrapper,
+    TelegramHelper,
 )
+from models.telegram.ratelimiter import TokenBucket, throttle
+from telegram_bot import MESSAGE_CHUNK_SIZE, chunk_lines
 
 sys.path.append(".")
 
@@ -57,3 +65,127 @@ def test_get_running_bot_info():  # pylint: disable=missing-function-docstring
 @unittest.skip
 def test_start_market_scanner():  # pylint: disable=missing-function-docstring
     assert wrapper.start_market_scanning(None, None, True, False) != ""
+
+
+@pytest.fixture
+def tmp_helper(tmp_path):
+    """helper with its own telegram_data folder, so the cache tests can rewrite files freely"""
+    (tmp_path / "telegram_data").mkdir()
+    helper = TelegramHelper("config.json.sample")
+    helper.datafolder = str(tmp_path)
+    return helper
+
+def test_get_bot_data_sees_write_data(tmp_helper):  # pylint: disable=missing-function-docstring
+    tmp_helper.data = {"botcontrol": {"status": "active"}}
+    tmp_helper.write_data(MARKET)
+    assert tmp_helper.get_bot_data(MARKET)["botcontrol"]["status"] == "active"
+
+    tmp_helper.data = {"botcontrol": {"status": "paused"}}
+    tmp_helper.write_data(MARKET)
+    assert tmp_helper.get_bot_data(MARKET)["botcontrol"]["status"] == "paused"
+
+def test_get_bot_data_sees_same_size_replace(tmp_helper):  # pylint: disable=missing-function-docstring
+    # the bot process replaces files without going through this helper, and a rewrite of the
+    # same size can land within the mtime granularity
+    path = os.path.join(tmp_helper.datafolder, "telegram_data", f"{MARKET}.json")
+    with open(path, "w", encoding="utf8") as outfile:
+        json.dump({"margin": "1.0%"}, outfile)
+    assert tmp_helper.get_bot_data(MARKET) == {"margin": "1.0%"}
+
+    with open(f"{path}.tmp", "w", encoding="utf8") as outfile:
+        json.dump({"margin": "2.0%"}, outfile)
+    stat = os.stat(path)
+    os.replace(f"{path}.tmp", path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert tmp_helper.get_bot_data(MARKET) == {"margin": "2.0%"}
+
+def test_read_data_changes_do_not_reach_cache(tmp_helper):  # pylint: disable=missing-function-docstring
+    tmp_helper.data = {"botcontrol": {"status": "active", "manualsell": False}}
+    tmp_helper.write_data(MARKET)
+    assert tmp_helper.get_bot_data(MARKET)["botcontrol"]["manualsell"] is False
+
+    assert tmp_helper.read_data(MARKET)
+    tmp_helper.data["botcontrol"]["manualsell"] = True
+    tmp_helper.data.pop("botcontrol")
+
+    assert tmp_helper.get_bot_data(MARKET) == {"botcontrol": {"status": "active", "manualsell": False}}
+
+def test_get_all_bot_list_skips_tmp_files(tmp_helper):  # pylint: disable=missing-function-docstring
+    tmp_helper.data = {"botcontrol": {"status": "active"}}
+    tmp_helper.write_data(MARKET)
+    # left behind by a writer that died between writing and renaming
+    leftover = os.path.join(tmp_helper.datafolder, "telegram_data", f"{MARKET}.json.123.456.tmp")
+    with open(leftover, "w", encoding="utf8") as outfile:
+        json.dump({"botcontrol": {"status": "active"}}, outfile)
+
+    assert tmp_helper.get_all_bot_list() == [MARKET]
+
+def test_chunk_lines_fit_a_message():  # pylint: disable=missing-function-docstring
+    lines = [f"{pair}USDT margin 1.0%\n" for pair in range(2000)]
+    chunks = list(chunk_lines(lines))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= MESSAGE_CHUNK_SIZE for chunk in chunks)
+    assert "".join(chunks) == "".join(lines)
+
+def test_chunk_lines_splits_long_line():  # pylint: disable=missing-function-docstring
+    lines = ["short\n", "x" * (MESSAGE_CHUNK_SIZE * 2 + 10) + "\n", "end\n"]
+    chunks = list(chunk_lines(lines))
+    assert all(len(chunk) <= MESSAGE_CHUNK_SIZE for chunk in chunks)
+    assert chunks[1] == chunks[2] == "x" * MESSAGE_CHUNK_SIZE
+    assert "".join(chunks) == "".join(lines)
+
+def test_chunk_lines_empty():  # pylint: disable=missing-function-docstring
+    assert not list(chunk_lines([]))
+
+def test_token_bucket_blocks_when_empty():  # pylint: disable=missing-function-docstring
+    bucket = TokenBucket(rate=20, capacity=3)
+
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.03
+
+    start = time.monotonic()
+    bucket.acquire()
+    # the fourth token needs 1/rate seconds of refill
+    assert 0.03 < time.monotonic() - start < 0.5
+
+def test_throttle_chats_are_independent():  # pylint: disable=missing-function-docstring
+    # each chat gets one message a second, a message to one chat must not hold up another
+    throttle("test-chat-a")
+    start = time.monotonic()
+    throttle("test-chat-b")
+    assert time.monotonic() - start < 0.2
+
+
+class _FloodedBot:  # pylint: disable=too-few-public-methods
+    """stub bot whose first `floods` sends fail with RetryAfter"""
+
+    def __init__(self, floods):
+        self.floods = floods
+        self.sent = []
+
+    def send_message(self, **kwargs):  # pylint: disable=missing-function-docstring
+        if self.floods > 0:
+            self.floods -= 1
+            raise RetryAfter(0)
+        self.sent.append(kwargs["text"])
+
+@pytest.fixture
+def no_throttle(monkeypatch):
+    """the per chat rate limit would add a second between retries"""
+    monkeypatch.setattr("models.telegram.helper.throttle", lambda chat_id: None)
+
+def test_send_retries_after_flood(no_throttle):  # pylint: disable=missing-function-docstring,redefined-outer-name,unused-argument
+    bot = _FloodedBot(1)
+    context = unittest.mock.Mock(bot=bot)
+    wrapper.helper.send_telegram_message(None, "hello", context=context)
+    assert bot.sent == ["hello"]
+
+def test_send_gives_up_after_repeated_floods(no_throttle):  # pylint: disable=missing-function-docstring,redefined-outer-name,unused-argument
+    bot = _FloodedBot(4)
+    context = unittest.mock.Mock(bot=bot)
+    with pytest.raises(RetryAfter):
+        wrapper.helper.send_telegram_message(None, "hello", context=context)
+    assert bot.floods == 0
+    assert not bot.sent
@@ -0,0 +1,168 @@
+import io
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.exchange.Granularity import Granularity
+from views.PyCryptoBot import BufferedConsole, RichText
+
+
+def _log_console():
+    return BufferedConsole(file=io.StringIO(), width=120, color_system=None)
+
+
+@pytest.fixture
+def app():
+    """the attributes of PyCryptoBot that RichText reads"""
+    return SimpleNamespace(
+        market="BTCUSDT",
+        granularity=Granularity.ONE_HOUR,
+        min_log_level="normal",
+        fast_log=False,
+        is_verbose=False,
+        disablelog=False,
+        console_log=_log_console(),
+    )
+
+
+def test_buffer_line_writes_nothing_until_flush():
+    console = _log_console()
+    console.buffer_line("first")
+    console.buffer_line("second")
+    assert console.file.getvalue() == ""
+
+    console.flush()
+    assert console.file.getvalue() == "first\nsecond\n"
+
+    # the buffer is emptied by flush
+    console.flush()
+    assert console.file.getvalue() == "first\nsecond\n"
+
+
+def test_print_writes_buffered_lines_first():
+    console = _log_console()
+    console.buffer_line("buffered")
+    console.print("direct")
+    assert console.file.getvalue() == "buffered\ndirect\n"
+
+
+def test_notify_buffers_log_line_until_flush(app, capsys):
+    RichText.notify("hello", app)
+    assert "hello" in capsys.readouterr().out
+    assert app.console_log.file.getvalue() == ""
+
+    RichText.flush(app)
+    line = app.console_log.file.getvalue()
+    assert line.startswith("Bot1 ")
+    assert line.endswith(" BTCUSDT 3600 hello\n")
+
+
+def test_notify_plain_without_tty_writes_no_escape_codes(app, capsys, monkeypatch):
+    monkeypatch.setattr("views.PyCryptoBot._STDOUT_IS_TTY", False)
+    RichText.notify_plain("hello", app, "warning")
+
+    out = capsys.readouterr().out
+    assert "\x1b" not in out
+    assert out.endswith(" BTCUSDT 3600 hello\n")
+    assert app.console_log.file.getvalue() == out
+
+
+def test_notify_plain_on_tty_is_coloured(app, capsys, monkeypatch):
+    monkeypatch.setattr("views.PyCryptoBot._STDOUT_IS_TTY", True)
+    RichText.notify_plain("hello", app, "warning")
+
+    out = capsys.readouterr().out
+    assert out.startswith("\x1b[35mBot1\x1b[0m ")
+    assert out.endswith("\x1b[38;5;208mhello\x1b[0m\n")
+    # the log file never gets colour codes
+    assert "\x1b" not in app.console_log.file.getvalue()
+
+
+def test_fast_log_notify_uses_plain_path(app, capsys, monkeypatch):
+    monkeypatch.setattr("views.PyCryptoBot._STDOUT_IS_TTY", False)
+    app.fast_log = True
+    RichText.notify("hello", app)
+
+    # written straight through, nothing left in the log console buffer
+    assert capsys.readouterr().out.endswith(" BTCUSDT 3600 hello\n")
+    assert app.console_log.file.getvalue().endswith(" BTCUSDT 3600 hello\n")
+
+
+@pytest.mark.parametrize("fast_log", [False, True])
+def test_notify_below_min_log_level_is_dropped(app, capsys, fast_log):
+    app.min_log_level = "warning"
+    app.fast_log = fast_log
+    RichText.notify("hello", app, level="normal")
+    RichText.flush(app)
+
+    assert capsys.readouterr().out == ""
+    assert app.console_log.file.getvalue() == ""
+
+
+def test_notify_above_min_log_level_is_kept(app, capsys):
+    app.min_log_level = "warning"
+    RichText.notify("hello", app, level="error")
+    RichText.flush(app)
+
+    assert "hello" in capsys.readouterr().out
+    assert "hello" in app.console_log.file.getvalue()
+
+
+def _spans(text):
+    return [(span.start, span.end, str(span.style)) for span in text.spans]
+
+
+@pytest.mark.parametrize(("margin", "plain", "spans"), [
+    ("-1.2%", "Margin: -1.2%", [(0, 5, "white"), (7, 13, "red")]),
+    ("3.4%",  "Margin: 3.4%",  [(0, 5, "white"), (7, 12, "green")]),
+    ("0%",    "Margin: 0%",    [(0, 10, "white")]),
+])
+def test_margin_text_spans(margin, plain, spans):
+    text = RichText.margin_text(margin, "BUY")
+    assert text.plain == plain
+    assert _spans(text) == spans
+
+    assert RichText.margin_text(margin, "SELL") is None
+
+
+@pytest.mark.parametrize(("price", "plain", "spans"), [
+    (101.5, "Delta: 1.5",  [(0, 5, "white"), (7, 10, "green")]),
+    (99.0,  "Delta: -1.0", [(0, 5, "white"), (7, 11, "red")]),
+])
+def test_delta_text_spans(price, plain, spans):
+    text = RichText.delta_text(price, 100.0, 2, "BUY")
+    assert text.plain == plain
+    assert _spans(text) == spans
+
+
+@pytest.mark.parametrize(("method", "args", "plain", "spans"), [
+    ("action_text",      ("BUY",),        "Action: BUY",       [(0, 7, "white"), (8, 11, "cyan")]),
+    ("last_action_text", ("SELL",),       "Last Action: SELL", [(0, 12, "white"), (13, 17, "cyan")]),
+    ("elder_ray",        (True, False),   "Elder-Ray: buy",    [(0, 10, "white"), (11, 14, "green")]),
+    ("elder_ray",        (False, True),   "Elder-Ray: sell",   [(0, 10, "white"), (11, 15, "red")]),
+    ("bull_bear",        (True, 300),     "BULL",              [(0, 4, "green")]),
+    ("bull_bear",        (False, 300),    "BEAR",              [(0, 4, "red")]),
+])
+def test_cached_label_spans(method, args, plain, spans):
+    text = getattr(RichText, method)(*args)
+    assert text.plain == plain
+    assert _spans(text) == spans
+
+    # callers get a copy, changing it leaves the cached Text alone
+    text.stylize("bold", 0, 1)
+    text.append(" changed")
+    again = getattr(RichText, method)(*args)
+    assert again is not text
+    assert again.plain == plain
+    assert _spans(again) == spans
+
+
+def test_cached_labels_return_none():
+    assert RichText.action_text("") is None
+    assert RichText.last_action_text("") is None
+    assert RichText.elder_ray(False, False) is None
+    assert RichText.elder_ray(True, False, disabled=True) is None
+    assert RichText.bull_bear(True, 199) is None
@@ -1,80 +1,223 @@
 from rich.table import Text
 from rich.table import Table
-from rich.console import Console
-from datetime import datetime
+from rich.console import Console, Group
+from rich.segment import Segments
+from rich.style import Style
+import functools
+import sys
+import threading
+import time
+
+
+class BufferedConsole(Console):
+    """Console that holds notification lines until flush(), then renders them in one print
+
+    The notification log file uses this and is flushed once per execute_job tick.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._line_buffer = []
+
+    def buffer_line(self, renderable) -> None:
+        """add a line to be printed on the next flush()"""
+        self._line_buffer.append(renderable)
+
+    def flush(self) -> None:
+        if self._line_buffer:
+            lines, self._line_buffer = self._line_buffer, []
+            super().print(Group(*lines))
+
+    def print(self, *args, **kwargs) -> None:
+        # keep buffered lines ahead of anything printed directly
+        self.flush()
+        super().print(*args, **kwargs)
+
+
+# created once, Console() probes the terminal every time it is instantiated
+_TERM_CONSOLE = Console()
+# keeps notification lines whole if notify is called from more than one thread (the websocket
+# clients run on their own threads), a lock is far cheaper than a Console per call
+_CONSOLE_LOCK = threading.Lock()
+
+# notification colour by level, anything else is "violet"
+_LEVEL_COLOR = {"warning": "dark_orange", "error": "red1", "critical": "red1 blink"}
+# notifications ranked below app.min_log_level are dropped, unknown levels rank as "normal"
+_LEVEL_RANK = {"normal": 0, "warning": 1, "error": 2, "critical": 3}
+
+# parsed once, styled_text adds any other colour it is given on first use
+_STYLES = {color: Style.parse(color) for color in ("white", "magenta", "yellow", "cyan", "violet", *_LEVEL_COLOR.values())}
+
+# ANSI SGR codes for notify_plain, the same colours rich uses for the names above
+_ANSI = {"violet": "38;5;177", "dark_orange": "38;5;208", "red1": "38;5;196", "red1 blink": "38;5;196;5"}
+# checked once, piped stdout (docker, systemd) gets the plain line without colour codes
+_STDOUT_IS_TTY = sys.stdout.isatty()
+
+_last_ts_epoch = 0
+_last_ts_str = ""
+
+
+def _timestamp() -> str:
+    """local time as "%Y-%m-%d %H:%M:%S", only reformatted when the second changes"""
+    global _last_ts_epoch, _last_ts_str
+
+    now = int(time.time())
+    if now != _last_ts_epoch:
+        # string first, so a reader that sees the new epoch also sees its string
+        _last_ts_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        _last_ts_epoch = now
+    return _last_ts_str
+
+
+# the Text builders below only ever see a handful of inputs, so the results are cached and
+# callers get a copy, as rich may add spans to a Text it is given
+
+
+@functools.lru_cache(maxsize=64)
+def _label_text(label: str, value: str, color: str) -> Text:
+    """"label: value" with the label and colon in white"""
+    label_len = len(label)
+
+    text = Text(f"{label}: {value}")
+    text.stylize("white", 0, label_len + 1)
+    text.stylize(color, label_len + 2, label_len + 2 + len(value))
+    return text
+
+
+@functools.lru_cache(maxsize=2)
+def _bull_bear_text(golden_cross: bool) -> Text:
+    if golden_cross:
+        text = Text("BULL")
+        text.stylize("green", 0, 4)
+    else:
+        text = Text("BEAR")
+        text.stylize("red", 0, 4)
+    return text
+
+
+def _market_labels(app: object) -> tuple:
+    """styled market and granularity for notify, kept on app and rebuilt only when either changes"""
+    key = (app.market, app.granularity)
+    if getattr(app, "_market_labels_key", None) != key:
+        app._market_text = Text(app.market, style=_STYLES["yellow"])
+        app._granularity_text = Text(str(app.granularity.to_integer), style=_STYLES["yellow"])
+        app._market_labels_key = key
+    return app._market_text, app._granularity_text
 
 
 class RichText:
     @staticmethod
     def notify(notification: str = "", app: object = None, level: str = "normal") -> None:
-        if notification == "":
+        if notification == "" or _LEVEL_RANK.get(level, 0) < _LEVEL_RANK[app.min_log_level]:
             return
 
-        if level == "warning":
-            color = "dark_orange"
-        elif level == "error":
-            color = "red1"
-        elif level == "critical":
-            color = "red1 blink"
+        if app.fast_log:
+            RichText.notify_plain(notification, app, level)
+            return
+
+        color = _LEVEL_COLOR.get(level, "violet")
+
+        timestamp = _timestamp()
+        market_text, granularity_text = _market_labels(app)
+
+        if app.is_verbose:
+            renderable = Table(title=None, box=None, show_header=False, show_footer=False)
+            renderable.add_row(
+                RichText.styled_text("Bot1", "magenta"),
+                RichText.styled_text(timestamp, "white"),
+                market_text,
+                granularity_text,
+                RichText.styled_text(notification, color),
+            )
         else:
-            color = "violet"
-
-        table_console = Table(title=None, box=None, show_header=False, show_footer=False)
-        table_console.add_row(
-            RichText.styled_text("Bot1", "magenta"),
-            RichText.styled_text(datetime.today().strftime("%Y-%m-%d %H:%M:%S"), "white"),
-            RichText.styled_text(app.market, "yellow"),
-            RichText.styled_text(str(app.granularity.to_integer), "yellow"),
-            RichText.styled_text(notification, color),
-        )
-        console_term = Console()
-        console_term.print(table_console)
-        if app.disablelog is False:
-            app.console_log.print(table_console)
+            # a single styled line skips the table layout pass
+            renderable = Text.assemble(
+                ("Bot1", _STYLES["magenta"]),
+                " ",
+                (timestamp, _STYLES["white"]),
+                " ",
+                market_text,
+                " ",
+                granularity_text,
+                " ",
+                (notification, _STYLES[color]),
+            )
+
+        with _CONSOLE_LOCK:
+            if app.disablelog is False:
+                # lay the line out once and hand the same segments to both consoles, each
+                # console still applies its own colour system when it writes them
+                renderable = Segments(_TERM_CONSOLE.render(renderable))
+                app.console_log.buffer_line(renderable)
+
+            _TERM_CONSOLE.print(renderable)
+
+    @staticmethod
+    def notify_plain(notification: str = "", app: object = None, level: str = "normal") -> None:
+        """notify without rich, writing one line straight to stdout, ANSI coloured on a terminal"""
+        if notification == "" or _LEVEL_RANK.get(level, 0) < _LEVEL_RANK[app.min_log_level]:
+            return
+
+        timestamp = _timestamp()
+        granularity = app.granularity.to_integer
+        line = f"Bot1 {timestamp} {app.market} {granularity} {notification}\n"
+
+        with _CONSOLE_LOCK:
+            if _STDOUT_IS_TTY:
+                color = _ANSI[_LEVEL_COLOR.get(level, "violet")]
+                sys.stdout.write(
+                    f"\x1b[35mBot1\x1b[0m \x1b[37m{timestamp}\x1b[0m \x1b[33m{app.market}\x1b[0m \x1b[33m{granularity}\x1b[0m \x1b[{color}m{notification}\x1b[0m\n"
+                )
+            else:
+                sys.stdout.write(line)
+            if app.disablelog is False:
+                app.console_log.flush()
+                app.console_log.file.write(line)
+
+    @staticmethod
+    def flush(app: object = None) -> None:
+        """print any notification lines still waiting in the log console buffer"""
+        with _CONSOLE_LOCK:
+            sys.stdout.flush()
+            if app is not None:
+                app.console_log.flush()
 
     @staticmethod
     def action_text(action: str = "WAIT") -> Text:
         if action == "":
             return None
 
-        action_msg = f"Action: {action}"
-
-        text = Text(action_msg)
-        text.stylize("white", 0, 7)
-        text.stylize("cyan", 8, len(action_msg))
-        return text
+        return _label_text("Action", action, "cyan").copy()
 
     @staticmethod
     def last_action_text(action: str = "WAIT") -> Text:
         if action == "":
             return None
 
-        action_msg = f"Last Action: {action}"
-
-        text = Text(action_msg)
-        text.stylize("white", 0, 12)
-        text.stylize("cyan", 13, len(action_msg))
-        return text
+        return _label_text("Last Action", action, "cyan").copy()
 
     @staticmethod
     def styled_text(input: str = "", color: str = "white", disabled: bool = False) -> Text:
         if disabled or input == "":
             return None
 
-        text = Text(input)
-        text.stylize(color, 0, len(input))
-        return text
+        style = _STYLES.get(color)
+        if style is None:
+            style = _STYLES[color] = Style.parse(color)
+
+        # a base style on the Text avoids adding a span with stylize()
+        return Text(input, style=style)
 
     @staticmethod
     def styled_label_text(label: str = "", label_color: str = "white", input: str = "", input_color: str = "cyan", disabled: bool = False) -> Text:
         if disabled or input == "":
             return None
 
-        label_text_msg = f"{label}: {input}"
+        label_len = len(label)
 
-        text = Text(label_text_msg)
-        text.stylize(label_color, 0, len(label))
-        text.stylize(input_color, len(label) + 1, len(label_text_msg))
+        text = Text(f"{label}: {input}")
+        text.stylize(label_color, 0, label_len)
+        text.stylize(input_color, label_len + 1, label_len + 2 + len(input))
         return text
 
     @staticmethod
@@ -85,17 +228,18 @@ class RichText:
         if margin_text == "" or last_action != "BUY":
             return None
 
-        margin_msg = f"Margin: {margin_text}"
-        text = Text(margin_msg)
+        # "Margin: " is 8 characters
+        msg_len = 8 + len(margin_text)
+        text = Text(f"Margin: {margin_text}")
 
         if margin_text == "0%":
-            text.stylize("white", 0, len(margin_msg))
+            text.stylize("white", 0, msg_len)
         elif margin_text.startswith("-"):
             text.stylize("white", 0, 5)
-            text.stylize("red", 7, len(margin_msg))
+            text.stylize("red", 7, msg_len)
         else:
             text.stylize("white", 0, 5)
-            text.stylize("green", 7, len(margin_msg))
+            text.stylize("green", 7, msg_len)
 
         return text
 
@@ -109,15 +253,17 @@ class RichText:
         if price == 0.0 or last_buy_price == 0.0 or last_action != "BUY":
             return None
 
-        delta_msg = f"Delta: {str(round(price - last_buy_price, precision))}"
-        text = Text(delta_msg)
+        delta = str(round(price - last_buy_price, precision))
+        # "Delta: " is 7 characters
+        msg_len = 7 + len(delta)
+        text = Text(f"Delta: {delta}")
 
-        if delta_msg.startswith("Delta: -"):
+        if delta.startswith("-"):
             text.stylize("white", 0, 5)
-            text.stylize("red", 7, len(delta_msg))
+            text.stylize("red", 7, msg_len)
         else:
             text.stylize("white", 0, 5)
-            text.stylize("green", 7, len(delta_msg))
+            text.stylize("green", 7, msg_len)
 
         return text
 
@@ -126,13 +272,7 @@ class RichText:
         if adjusttotalperiods < 200:
             return None
 
-        if golden_cross:
-            text = Text("BULL")
-            text.stylize("green", 0, 4)
-        else:
-            text = Text("BEAR")
-            text.stylize("red", 0, 4)
-        return text
+        return _bull_bear_text(golden_cross).copy()
 
     @staticmethod
     def elder_ray(elder_ray_buy: bool = False, elder_ray_sell: bool = False, disabled: bool = False) -> Text:
@@ -140,17 +280,11 @@ class RichText:
             return None
 
         if elder_ray_buy:
-            text = Text("Elder-Ray: buy")
-            text.stylize("white", 0, 10)
-            text.stylize("green", 11, 14)
+            return _label_text("Elder-Ray", "buy", "green").copy()
         elif elder_ray_sell:
-            text = Text("Elder-Ray: sell")
-            text.stylize("white", 0, 10)
-            text.stylize("red", 11, 15)
-        else:
-            return None
+            return _label_text("Elder-Ray", "sell", "red").copy()
 
-        return text
+        return None
 
     @staticmethod
     def on_balance_volume(obv: float = 0.0, obv_pc: int = 0, disabled: bool = False) -> Text:
@@ -159,14 +293,9 @@ class RichText:
 
         obv_msg = f"OBV: {obv:.2f} ({obv_pc}%)"
 
-        if obv >= 0:
-            text = Text(obv_msg)
-            text.stylize("white", 0, 4)
-            text.stylize("green", 5, len(obv_msg))
-        else:
-            text = Text(f"OBV: {obv:.2f} ({obv_pc}%)")
-            text.stylize("white", 0, 4)
-            text.stylize("red", 5, len(obv_msg))
+        text = Text(obv_msg)
+        text.stylize("white", 0, 4)
+        text.stylize("green" if obv >= 0 else "red", 5, len(obv_msg))
 
         return text
 
@@ -190,7 +319,10 @@ class RichText:
                 color = "red"
             operator = "<"
 
-        text = Text(f"{label} {value1} {operator} {value2}")
-        text.stylize("white", 0, len(label))
-        text.stylize(color, len(label) + 1, len(text))
+        label_len = len(label)
+        msg = f"{label} {value1} {operator} {value2}"
+
+        text = Text(msg)
+        text.stylize("white", 0, label_len)
+        text.stylize(color, label_len + 1, len(msg))
         return text